@@ -0,0 +1,239 @@
+# example_fastapi/admission.py
+
+# Importações de bibliotecas externas
+import math
+import time
+from dataclasses import dataclass, field
+import orjson
+from starlette.routing import Match
+
+# --- Configuração do Controle de Admissão ---
+# O limite começa perto do tamanho do pool do SQLAlchemy (5 + 10 de overflow):
+# acima disso, as requisições só esperariam uma conexão livre.
+INITIAL_LIMIT = 15
+MIN_LIMIT = 4
+# Teto próximo ao threadpool padrão do FastAPI/AnyIO (40 threads)
+MAX_LIMIT = 40
+# A rota está "lenta" quando a média recente passa de TOLERANCE x a latência base
+TOLERANCE = 2.0
+# Médias abaixo disso nunca contam como lentas (evita ruído em rotas muito rápidas)
+MIN_SLOW_MS = 20.0
+# Amostras necessárias antes de a latência base de uma rota ser considerada
+MIN_SAMPLES = 20
+# Redução multiplicativa do limite ao detectar lentidão
+BACKOFF = 0.9
+# Intervalo mínimo entre duas reduções (uma redução por "rodada" de lentidão)
+DECREASE_COOLDOWN_SECONDS = 0.5
+# Média móvel exponencial de janela curta (~10 requisições) da latência por rota
+EWMA_ALPHA = 0.1
+# Latência base: média móvel de janela longa (~1/alpha requisições). Acompanha
+# a mistura real de respostas da rota (ex.: 304 rápidos e 200 completos), mas
+# fica congelada enquanto a rota está lenta: uma degradação persistente não
+# vira o "novo normal" (como a janela longa do Gradient2).
+BASELINE_ALPHA = 0.01
+# Máximo de rotas com estatísticas próprias; as demais ficam agrupadas
+MAX_ROUTES = 200
+UNMATCHED_ROUTE = "<sem rota>"
+OTHER_ROUTES = "<outras>"
+
+# Prioridades por prefixo de rota: fração do limite que cada classe pode ocupar.
+# Rotas críticas continuam atendidas quando as demais já estão sendo rejeitadas.
+PRIORITY_CAPACITY = {
+    "critical": math.inf,  # Nunca rejeitadas (health checks)
+    "high": 1.5,           # Login: pode usar a folga acima do limite
+    "normal": 1.0,
+    "low": 0.7,            # Buscas e listagens pesadas são as primeiras a cair
+}
+ROUTE_PRIORITIES = [
+    ("/health", "critical"),
+    ("/metrics", "critical"),
+    ("/users/token", "high"),
+    ("/items/search", "low"),
+]
+
+def route_key(scope) -> str:
+    """
+    Agrupa as requisições pelo modelo da rota ('/items/42' -> 'GET /items/{item_id}').
+    Caminhos que não correspondem a nenhuma rota (404, varreduras) ficam
+    todos em UNMATCHED_ROUTE, para não criar uma entrada por caminho.
+    """
+    app = scope.get("app")
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match != Match.NONE:
+            return f"{scope['method']} {getattr(route, 'path', UNMATCHED_ROUTE)}"
+    return f"{scope['method']} {UNMATCHED_ROUTE}"
+
+def route_priority(path: str) -> str:
+    for prefix, priority in ROUTE_PRIORITIES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return priority
+    return "normal"
+
+
+@dataclass
+class RouteStats:
+    count: int = 0
+    rejected: int = 0
+    errors: int = 0
+    ewma_ms: float | None = None
+    baseline_ms: float | None = None
+    last_ms: float = 0.0
+
+    def observe(self, latency_ms: float):
+        self.count += 1
+        self.last_ms = latency_ms
+        self.ewma_ms = latency_ms if self.ewma_ms is None else (
+            EWMA_ALPHA * latency_ms + (1 - EWMA_ALPHA) * self.ewma_ms
+        )
+        if self.baseline_ms is None:
+            self.baseline_ms = latency_ms
+        elif not self.slow:
+            self.baseline_ms = BASELINE_ALPHA * latency_ms + (1 - BASELINE_ALPHA) * self.baseline_ms
+
+    @property
+    def slow(self) -> bool:
+        """Média recente bem acima da média de longo prazo (fila se formando)."""
+        if self.count < MIN_SAMPLES:
+            return False
+        return self.ewma_ms > max(MIN_SLOW_MS, TOLERANCE * self.baseline_ms)
+
+
+@dataclass
+class AdaptiveLimiter:
+    """
+    Limite de concorrência adaptativo (AIMD) guiado pela latência por rota.
+
+    - Aumento aditivo: a cada requisição rápida concluída com o sistema perto
+      do limite, o limite cresce 1/limite (cerca de +1 por "rodada").
+    - Redução multiplicativa: quando a média recente de latência de uma rota
+      passa de TOLERANCE x a sua média de longo prazo (ou a requisição falha
+      com 5xx), o limite é multiplicado por BACKOFF, no máximo uma vez por
+      DECREASE_COOLDOWN_SECONDS.
+    """
+    limit: float = INITIAL_LIMIT
+    min_limit: int = MIN_LIMIT
+    max_limit: int = MAX_LIMIT
+    max_routes: int = MAX_ROUTES
+    in_flight: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    routes: dict[str, RouteStats] = field(default_factory=dict)
+    _last_decrease: float = 0.0
+
+    def try_acquire(self, priority: str) -> bool:
+        capacity = self.limit * PRIORITY_CAPACITY[priority]
+        if self.in_flight >= capacity:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        return True
+
+    def _stats(self, route: str) -> RouteStats:
+        stats = self.routes.get(route)
+        if stats is None:
+            if len(self.routes) >= self.max_routes:
+                route = OTHER_ROUTES
+            stats = self.routes.setdefault(route, RouteStats())
+        return stats
+
+    def release(self, route: str, latency_ms: float, server_error: bool):
+        self.in_flight -= 1
+        stats = self._stats(route)
+        stats.observe(latency_ms)
+        if server_error:
+            stats.errors += 1
+
+        now = time.monotonic()
+        if stats.slow or server_error:
+            if now - self._last_decrease >= DECREASE_COOLDOWN_SECONDS:
+                self.limit = max(self.min_limit, self.limit * BACKOFF)
+                self._last_decrease = now
+        elif self.in_flight + 1 >= self.limit * 0.8:
+            # Só cresce quando o limite está de fato sendo usado
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def record_rejection(self, route: str):
+        self._stats(route).rejected += 1
+
+    def retry_after_seconds(self, route: str) -> int:
+        """Estimativa de quando haverá capacidade: latência média x fila / limite."""
+        stats = self.routes.get(route)
+        latency_s = (stats.ewma_ms if stats and stats.ewma_ms else 100.0) / 1000
+        return max(1, math.ceil(latency_s * self.in_flight / max(self.limit, 1)))
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "routes": {
+                route: {
+                    "count": s.count,
+                    "rejected": s.rejected,
+                    "errors": s.errors,
+                    "ewma_ms": round(s.ewma_ms or 0.0, 2),
+                    "baseline_ms": round(s.baseline_ms or 0.0, 2),
+                }
+                for route, s in self.routes.items()
+            },
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Middleware ASGI que rejeita rápido (503 + Retry-After) as requisições
+    acima do limite adaptativo, em vez de deixá-las esperar no threadpool e
+    na fila do pool de conexões. Roda no event loop, então os contadores do
+    AdaptiveLimiter não precisam de lock.
+    """
+
+    def __init__(self, app, limiter: AdaptiveLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        route = route_key(scope)
+        if not self.limiter.try_acquire(route_priority(path)):
+            self.limiter.record_rejection(route)
+            await self._reject(send, self.limiter.retry_after_seconds(route))
+            return
+
+        status_code = 500
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            self.limiter.release(route, latency_ms, server_error=status_code >= 500)
+
+    @staticmethod
+    async def _reject(send, retry_after: int):
+        body = orjson.dumps({"detail": "Server overloaded, retry later"})
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Instância única do processo (exposta em /metrics/admission)
+limiter = AdaptiveLimiter()
@@ -0,0 +1,66 @@
+# example_fastapi/benchmark_serialization.py
+#
+# Compara o custo de CPU por requisição de uma listagem de 100 itens:
+# - caminho padrão: objetos ORM validados por schemas.Item (from_attributes)
+#   e serializados pelo encoder JSON padrão do FastAPI;
+# - caminho rápido: linhas (mappings) + TypeAdapter + orjson (FastJSONResponse).
+#
+# Não precisa de banco de dados. Execute a partir da raiz do repositório:
+#   python -m fastapi_example.benchmark_serialization
+
+# Importações de bibliotecas externas
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+# Importações de módulos locais
+from . import models, schemas
+from .responses import FastJSONResponse, ITEM_ROWS_ADAPTER, rows_response
+
+QUANTIDADE_ITENS = 100
+REQUISICOES = 2000
+
+def _criar_app(quantidade: int) -> FastAPI:
+    objetos = [
+        models.Item(id=i, title=f"Item {i}", description=f"Descrição do item {i}" * 3, owner_id=i % 10)
+        for i in range(quantidade)
+    ]
+    linhas = [
+        {"id": o.id, "title": o.title, "description": o.description, "owner_id": o.owner_id}
+        for o in objetos
+    ]
+
+    app = FastAPI()
+
+    @app.get("/padrao", response_model=list[schemas.Item])
+    def padrao():
+        return objetos
+
+    @app.get("/rapido", response_model=list[schemas.Item], response_class=FastJSONResponse)
+    def rapido():
+        return rows_response(ITEM_ROWS_ADAPTER, linhas)
+
+    return app
+
+def medir(client: TestClient, rota: str, requisicoes: int) -> float:
+    """Retorna o tempo de CPU médio (ms) por requisição."""
+    client.get(rota)  # aquecimento
+    inicio = time.process_time()
+    for _ in range(requisicoes):
+        resposta = client.get(rota)
+        resposta.raise_for_status()
+    return (time.process_time() - inicio) * 1000 / requisicoes
+
+def main():
+    client = TestClient(_criar_app(QUANTIDADE_ITENS))
+    assert client.get("/padrao").json() == client.get("/rapido").json(), "As respostas devem ser iguais"
+
+    print(f"--- {REQUISICOES} requisições de {QUANTIDADE_ITENS} itens ---")
+    # O tempo inclui o TestClient, igual para os dois caminhos
+    padrao = medir(client, "/padrao", REQUISICOES)
+    rapido = medir(client, "/rapido", REQUISICOES)
+    print(f"Caminho padrão: {padrao:.3f} ms de CPU por requisição")
+    print(f"Caminho rápido: {rapido:.3f} ms de CPU por requisição")
+    print(f"Redução: {(1 - rapido / padrao) * 100:.1f}%")
+
+if __name__ == "__main__":
+    main()
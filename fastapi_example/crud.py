@@ -1,8 +1,11 @@
 # example_fastapi/crud.py
 
 # Importações de bibliotecas externas
+from sqlalchemy import delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from . import models, schemas, auth
+from .etags import item_versions
 
 # --- Funções de Usuário ---
 
@@ -45,6 +48,37 @@ def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate) -> m
     
     return db_user
 
+def get_user_rows(db: Session, skip: int = 0, limit: int = 100):
+    stmt = (
+        select(models.User.id, models.User.email, models.User.is_active)
+        .order_by(models.User.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).mappings().all()
+
+def get_user_rows_with_item_count(db: Session, skip: int = 0, limit: int = 100):
+    """
+    Usuários com a quantidade de itens de cada um, em uma única consulta
+    (LEFT JOIN + GROUP BY), em vez de carregar User.items por usuário.
+    """
+    # A página de usuários é escolhida antes da agregação, para não contar itens de todos
+    users = (
+        select(models.User.id, models.User.email, models.User.is_active)
+        .order_by(models.User.id)
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    stmt = (
+        select(users.c.id, users.c.email, users.c.is_active,
+               func.count(models.Item.id).label("item_count"))
+        .outerjoin(models.Item, models.Item.owner_id == users.c.id)
+        .group_by(users.c.id, users.c.email, users.c.is_active)
+        .order_by(users.c.id)
+    )
+    return db.execute(stmt).mappings().all()
+
 # --- Função para criar um usuário admin inicial ---
 
 def create_initial_superuser(db: Session) -> models.User:
@@ -75,10 +109,25 @@ def create_initial_superuser(db: Session) -> models.User:
 def get_items(db: Session, skip: int = 0, limit: int = 100) -> list[models.Item]:
     return db.query(models.Item).offset(skip).limit(limit).all()
 
+# Listagens rápidas: apenas as colunas da resposta, como linhas (sem objetos ORM)
+def get_item_rows(db: Session, skip: int = 0, limit: int = 100):
+    # 'version' e 'updated_at' alimentam a ETag; o TypedDict da resposta os descarta
+    stmt = (
+        select(models.Item.id, models.Item.title, models.Item.description, models.Item.owner_id,
+               models.Item.version, models.Item.updated_at)
+        .order_by(models.Item.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).mappings().all()
+
 def create_user_item(db: Session, item: schemas.ItemCreate, user_id: int) -> models.Item:
     db_item = models.Item(**item.model_dump(), owner_id=user_id)
     db.add(db_item)
+    db.flush()
+    _stats_item_created(db, owner_id=user_id)
     db.commit()
+    item_versions.item_changed(db_item.id)
     db.refresh(db_item)
     return db_item
 
@@ -86,6 +135,152 @@ def create_user_item(db: Session, item: schemas.ItemCreate, user_id: int) -> mod
 def get_item(db: Session, item_id: int) -> models.Item | None:
     return db.query(models.Item).filter(models.Item.id == item_id).first()
 
+# Itens de um usuário: atendida pelo índice (owner_id, id)
+def get_user_item_rows(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+    stmt = (
+        select(models.Item.id, models.Item.title, models.Item.description, models.Item.owner_id)
+        .where(models.Item.owner_id == user_id)
+        .order_by(models.Item.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).mappings().all()
+
+# Consulta leve para o GET condicional: só a versão e a data de alteração
+def get_item_version(db: Session, item_id: int):
+    stmt = select(models.Item.version, models.Item.updated_at).where(models.Item.id == item_id)
+    return db.execute(stmt).first()
+
+def get_page_versions(db: Session, skip: int = 0, limit: int = 100):
+    stmt = (
+        select(models.Item.id, models.Item.version, models.Item.updated_at)
+        .order_by(models.Item.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).all()
+
 def delete_item(db: Session, item: models.Item):
+    item_id, owner_id = item.id, item.owner_id
     db.delete(item)
-    db.commit()
\ No newline at end of file
+    db.flush()
+    _stats_items_deleted(db, owner_id=owner_id)
+    db.commit()
+    item_versions.item_changed(item_id)
+
+# Verificações de propriedade que leem apenas índices (sem carregar o Item)
+def item_exists(db: Session, item_id: int) -> bool:
+    return db.scalar(select(models.Item.id).where(models.Item.id == item_id)) is not None
+
+def item_owned_by(db: Session, item_id: int, user_id: int) -> bool:
+    # Atendida pelo índice (owner_id, id)
+    stmt = select(models.Item.id).where(models.Item.owner_id == user_id, models.Item.id == item_id)
+    return db.scalar(stmt) is not None
+
+def delete_item_by_id(db: Session, item_id: int, user_id: int) -> bool:
+    result = db.execute(
+        delete(models.Item).where(models.Item.id == item_id, models.Item.owner_id == user_id)
+    )
+    if result.rowcount:
+        _stats_items_deleted(db, owner_id=user_id, count=result.rowcount)
+    db.commit()
+    item_versions.item_changed(item_id)
+    return result.rowcount > 0
+
+# --- Estatísticas de Itens por Dono (tabela de resumo) ---
+# As funções _stats_* rodam na mesma transação da escrita em items, então o
+# resumo nunca fica inconsistente com a tabela.
+
+def _stats_item_created(db: Session, owner_id: int):
+    # Upsert atômico: cria a linha do dono ou incrementa o contador
+    stmt = pg_insert(models.UserItemStats).values(
+        owner_id=owner_id, item_count=1, last_item_created_at=func.now()
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.UserItemStats.owner_id],
+        set_={
+            "item_count": models.UserItemStats.item_count + 1,
+            "last_item_created_at": func.greatest(
+                models.UserItemStats.last_item_created_at, stmt.excluded.last_item_created_at
+            ),
+        },
+    )
+    db.execute(stmt)
+
+def _stats_items_deleted(db: Session, owner_id: int, count: int = 1):
+    db.execute(
+        update(models.UserItemStats)
+        .where(models.UserItemStats.owner_id == owner_id)
+        .values(item_count=func.greatest(models.UserItemStats.item_count - count, 0))
+    )
+
+def get_item_stats_rows(db: Session, skip: int = 0, limit: int = 100):
+    stmt = (
+        select(models.UserItemStats.owner_id, models.UserItemStats.item_count,
+               models.UserItemStats.last_item_created_at)
+        .where(models.UserItemStats.item_count > 0)
+        .order_by(models.UserItemStats.owner_id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).mappings().all()
+
+def get_item_stats_totals(db: Session) -> tuple[int, int]:
+    """(total de itens, total de donos com itens), somando apenas o resumo."""
+    stmt = select(
+        func.coalesce(func.sum(models.UserItemStats.item_count), 0),
+        func.count().filter(models.UserItemStats.item_count > 0),
+    )
+    return tuple(db.execute(stmt).one())
+
+def rebuild_item_stats(db: Session) -> int:
+    """
+    Reconstrói a tabela de resumo a partir de items (comando de reparo).
+    O LOCK bloqueia as atualizações incrementais até o fim da reconstrução,
+    para que nenhuma escrita concorrente seja perdida. Retorna o número de donos.
+    """
+    db.execute(text("LOCK TABLE user_item_stats IN EXCLUSIVE MODE"))
+    db.execute(delete(models.UserItemStats))
+    db.execute(
+        pg_insert(models.UserItemStats).from_select(
+            ["owner_id", "item_count", "last_item_created_at"],
+            select(models.Item.owner_id, func.count(), func.max(models.Item.created_at))
+            .group_by(models.Item.owner_id),
+        )
+    )
+    # O rowcount de INSERT ... SELECT não é confiável por este caminho (-1)
+    donos = db.execute(select(func.count()).select_from(models.UserItemStats)).scalar_one()
+    db.commit()
+    return donos
+
+# --- Busca de Itens ---
+
+def _escape_like(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def search_items(db: Session, q: str, skip: int = 0, limit: int = 20, fuzzy: bool = False) -> list:
+    """
+    Busca itens por texto, ordenados por relevância.
+    - fuzzy=False: busca textual (websearch_to_tsquery) no índice GIN do search_vector.
+    - fuzzy=True: prefixo ou similaridade trigram no título (índice gin_trgm_ops).
+    Retorna tuplas (Item, rank).
+    """
+    if fuzzy:
+        rank = func.similarity(models.Item.title, q)
+        condicao = or_(
+            models.Item.title.ilike(_escape_like(q) + "%", escape="\\"),
+            models.Item.title.op("%")(q),
+        )
+    else:
+        consulta = func.websearch_to_tsquery("portuguese", q)
+        rank = func.ts_rank_cd(models.Item.search_vector, consulta)
+        condicao = models.Item.search_vector.op("@@")(consulta)
+
+    stmt = (
+        select(models.Item, rank.label("rank"))
+        .where(condicao)
+        .order_by(rank.desc(), models.Item.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return db.execute(stmt).all()
\ No newline at end of file
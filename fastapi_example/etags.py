@@ -0,0 +1,119 @@
+# example_fastapi/etags.py
+
+# Importações de bibliotecas externas
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from fastapi import Response, status
+
+# Por quanto tempo uma versão guardada em memória é confiável sem consultar o banco.
+# Escritas feitas por este processo invalidam o cache na hora; o TTL limita o
+# atraso para escritas feitas por outros processos/réplicas da API.
+VERSION_CACHE_TTL_SECONDS = 2.0
+# Máximo de itens e de páginas em memória; as entradas menos usadas saem primeiro
+VERSION_CACHE_MAX_ENTRIES = 10_000
+
+
+def item_etag(item_id: int, version: int) -> str:
+    return f'"item-{item_id}-v{version}"'
+
+def page_etag(skip: int, limit: int, versions) -> str:
+    """ETag de uma página da listagem, a partir dos pares (id, versão) dela."""
+    digest = hashlib.blake2b(repr(list(versions)).encode(), digest_size=8).hexdigest()
+    return f'"items-{skip}-{limit}-{digest}"'
+
+def http_date(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+    # usegmt exige tzinfo == timezone.utc (o psycopg devolve, p. ex., ZoneInfo('Etc/UTC'))
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (aceita lista de ETags, 'W/' e '*')."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+def cache_headers(etag: str, last_modified: str | None) -> dict:
+    # 'no-cache' obriga o cliente a revalidar (If-None-Match) a cada uso
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+def not_modified(etag: str, last_modified: str | None) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, last_modified))
+
+
+class VersionCache:
+    """
+    Cache em memória das ETags de itens e de páginas da listagem.
+
+    Permite responder 304 sem nenhuma consulta ao banco enquanto a entrada
+    for recente e nenhuma escrita deste processo a tiver invalidado. Cada
+    escrita incrementa a 'geração', o que invalida todas as páginas.
+    Cada dicionário guarda no máximo 'max_entries' entradas (LRU).
+    """
+
+    def __init__(self, ttl_seconds: float = VERSION_CACHE_TTL_SECONDS,
+                 max_entries: int = VERSION_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._items: OrderedDict[int, tuple[float, str, str | None]] = OrderedDict()
+        self._pages: OrderedDict[tuple, tuple[float, int, str, str | None]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _get(self, entries: OrderedDict, key):
+        with self._lock:
+            entry = entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.ttl_seconds:
+                del entries[key]
+                return None
+            entries.move_to_end(key)
+            return entry
+
+    def _set(self, entries: OrderedDict, key, entry: tuple):
+        with self._lock:
+            entries[key] = entry
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def get_item(self, item_id: int) -> tuple[str, str | None] | None:
+        entry = self._get(self._items, item_id)
+        if entry is None:
+            return None
+        return entry[1], entry[2]
+
+    def set_item(self, item_id: int, etag: str, last_modified: str | None):
+        self._set(self._items, item_id, (time.monotonic(), etag, last_modified))
+
+    def get_page(self, key: tuple) -> tuple[str, str | None] | None:
+        entry = self._get(self._pages, key)
+        if entry is None or entry[1] != self._generation:
+            return None
+        return entry[2], entry[3]
+
+    def set_page(self, key: tuple, etag: str, last_modified: str | None):
+        self._set(self._pages, key, (time.monotonic(), self._generation, etag, last_modified))
+
+    def item_changed(self, item_id: int | None = None):
+        """Chamado a cada escrita em items (criação, alteração ou exclusão)."""
+        with self._lock:
+            self._generation += 1
+            if item_id is not None:
+                self._items.pop(item_id, None)
+            self._pages.clear()
+
+
+# Instância única do processo
+item_versions = VersionCache()
@@ -1,33 +1,45 @@
 # example_fastapi/main.py
 
 # Importações de bibliotecas externas
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from . import models, crud
 from .database import engine, get_db
+from .admission import AdmissionControlMiddleware, limiter
 # Importe todos os routers
 from .routers import users, items, root # <- Adicione 'root'
 
 # ----------------------------------------------------
-# Inicialização (Sem Alteração)
+# Inicialização
 # ----------------------------------------------------
 
-# Cria todas as tabelas no DB
-models.Base.metadata.create_all(bind=engine)
-
-# Cria o usuário admin se ele não existir
-try:
-    db = next(get_db())
-    crud.create_initial_superuser(db=db)
-finally:
-    if 'db' in locals() and db:
-        db.close()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Executado quando o servidor inicia, não na importação do módulo: importar
+    o main.py (por exemplo, para medir o tempo de importação) não acessa o banco.
+    """
+    # Cria todas as tabelas no DB
+    models.Base.metadata.create_all(bind=engine)
+
+    # Cria o usuário admin se ele não existir
+    try:
+        db = next(get_db())
+        crud.create_initial_superuser(db=db)
+    finally:
+        if 'db' in locals() and db:
+            db.close()
+    yield
 
 
 # ----------------------------------------------------
 # Aplicação FastAPI
 # ----------------------------------------------------
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Controle de admissão: rejeita com 503 o excesso de requisições sob sobrecarga
+app.add_middleware(AdmissionControlMiddleware, limiter=limiter)
 
 # 2. Incluir os routers na aplicação principal
 # É boa prática incluir a rota raiz primeiro (sem prefixo)
@@ -0,0 +1,127 @@
+# example_fastapi/migrate.py
+#
+# Migrações de esquema para bancos que já existiam antes das alterações dos
+# modelos. O Base.metadata.create_all (main.py) só cria tabelas que ainda não
+# existem: nunca adiciona colunas ou índices a uma tabela existente.
+#
+# Cada migração roda uma única vez (registrada na tabela schema_migrations) e
+# usa DDL idempotente, então também pode ser aplicada a um banco novo.
+# Índices são criados com CREATE INDEX CONCURRENTLY, sem bloquear escritas.
+#
+# Execute a partir da raiz do repositório, antes de subir a nova versão da API:
+#   python -m fastapi_example.migrate
+
+# Importações de bibliotecas externas
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+# Importações de módulos locais
+from . import crud, models
+from .database import engine
+
+SQL_CREATE_CONTROLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    nome TEXT PRIMARY KEY,
+    aplicada_em TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+SQL_INDICE_VALIDO = """
+SELECT i.indisvalid
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+WHERE c.relname = :nome
+"""
+
+
+def _criar_indice(conn, nome: str, ddl: str):
+    """
+    Executa um CREATE INDEX CONCURRENTLY IF NOT EXISTS. Se uma tentativa
+    anterior foi interrompida, o índice ficou marcado como inválido (e o
+    IF NOT EXISTS o manteria assim): ele é removido e criado de novo.
+    """
+    if conn.execute(text(SQL_INDICE_VALIDO), {"nome": nome}).scalar() is False:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}"))
+    conn.execute(text(ddl))
+
+
+# --- Migrações (em ordem) ---
+
+def busca_textual(conn):
+    """Coluna search_vector e índices da busca de itens."""
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    # A coluna gerada reescreve a tabela (bloqueio exclusivo durante o ALTER)
+    conn.execute(text(
+        "ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('portuguese'::regconfig, coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('portuguese'::regconfig, coalesce(description, '')), 'B')"
+        ") STORED"
+    ))
+    _criar_indice(conn, "ix_items_search_vector",
+                  "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_items_search_vector "
+                  "ON items USING gin (search_vector)")
+    _criar_indice(conn, "ix_items_title_trgm",
+                  "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_items_title_trgm "
+                  "ON items USING gin (title gin_trgm_ops)")
+    _criar_indice(conn, "ix_items_owner_id_id",
+                  "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_items_owner_id_id "
+                  "ON items (owner_id, id)")
+    # A busca usa o search_vector; o B-tree em description não é mais usado
+    conn.execute(text("DROP INDEX CONCURRENTLY IF EXISTS ix_items_description"))
+
+
+def versao_itens(conn):
+    """Colunas version e updated_at dos itens (ETags e controle de versão do ORM)."""
+    # Com DEFAULT constante/estável, o PostgreSQL 11+ adiciona as colunas sem
+    # reescrever a tabela. Sem elas, todo UPDATE do ORM (version_id_col) falha.
+    conn.execute(text("ALTER TABLE items ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1"))
+    conn.execute(text(
+        "ALTER TABLE items ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now()"
+    ))
+
+
+def estatisticas_itens(conn):
+    """Coluna created_at dos itens e preenchimento inicial de user_item_stats."""
+    # Itens já existentes recebem o instante da migração como data de criação
+    conn.execute(text(
+        "ALTER TABLE items ADD COLUMN IF NOT EXISTS created_at timestamptz NOT NULL DEFAULT now()"
+    ))
+    models.UserItemStats.__table__.create(conn, checkfirst=True)
+    # Backfill a partir de items (o mesmo do repair_item_stats). Usa uma sessão
+    # própria: o LOCK TABLE da reconstrução exige um bloco de transação.
+    with Session(conn.engine) as db:
+        donos = crud.rebuild_item_stats(db)
+    print(f"  user_item_stats preenchida: {donos} donos com itens.")
+
+
+MIGRACOES = [
+    ("0001_busca_textual", busca_textual),
+    ("0002_versao_itens", versao_itens),
+    ("0003_estatisticas_itens", estatisticas_itens),
+]
+
+
+def aplicar_migracoes(engine=engine) -> list[str]:
+    """Aplica as migrações pendentes e retorna os nomes das aplicadas."""
+    # Tabelas novas (e o esquema completo, em um banco vazio) vêm do create_all
+    models.Base.metadata.create_all(bind=engine)
+    aplicadas = []
+    # AUTOCOMMIT: CREATE INDEX CONCURRENTLY não pode rodar dentro de uma transação
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(SQL_CREATE_CONTROLE))
+        feitas = set(conn.execute(text("SELECT nome FROM schema_migrations")).scalars())
+        for nome, migracao in MIGRACOES:
+            if nome in feitas:
+                continue
+            print(f"Aplicando {nome}: {migracao.__doc__}")
+            migracao(conn)
+            conn.execute(text("INSERT INTO schema_migrations (nome) VALUES (:nome)"), {"nome": nome})
+            aplicadas.append(nome)
+    return aplicadas
+
+def main():
+    aplicadas = aplicar_migracoes()
+    print(f"{len(aplicadas)} migração(ões) aplicada(s)." if aplicadas else "Banco já atualizado.")
+
+if __name__ == "__main__":
+    main()
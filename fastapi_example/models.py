@@ -1,8 +1,10 @@
 # example_fastapi/models.py
 
 # Importações de bibliotecas externas
+from datetime import datetime
 from typing import List
-from sqlalchemy import String, Integer, Boolean, ForeignKey
+from sqlalchemy import String, Integer, Boolean, DateTime, ForeignKey, Computed, DDL, Index, event, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 # Importa a Base declarativa que foi definida em database.py
 from .database import Base 
@@ -25,14 +27,69 @@ class User(Base):
 # --- Modelo Item ---
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # Busca textual: índice GIN sobre o tsvector gerado
+        Index("ix_items_search_vector", "search_vector", postgresql_using="gin"),
+        # Busca por prefixo/aproximada no título (extensão pg_trgm)
+        Index("ix_items_title_trgm", "title", postgresql_using="gin",
+              postgresql_ops={"title": "gin_trgm_ops"}),
+        # Listagem por dono e verificação de propriedade (index-only scan)
+        Index("ix_items_owner_id_id", "owner_id", "id"),
+    )
 
     # Colunas simples
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String, index=True)
-    description: Mapped[str | None] = mapped_column(String, index=True, nullable=True) # Uso do tipo "str | None"
+    # Sem índice B-tree: texto longo e sem uso em igualdade; a busca usa o search_vector
+    description: Mapped[str | None] = mapped_column(String, nullable=True) # Uso do tipo "str | None"
+
+    # Coluna gerada pelo PostgreSQL com o título (peso A) e a descrição (peso B).
+    # 'deferred' evita carregá-la junto com o Item.
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('portuguese'::regconfig, coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('portuguese'::regconfig, coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    # Versão e data da última alteração, usadas nas ETags (GET condicional).
+    # O SQLAlchemy incrementa 'version' em todo UPDATE feito pelo ORM.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
 
     # Chave Estrangeira: mapped_column(ForeignKey)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id")) 
 
     # Relacionamento: Item.owner é um único objeto User
-    owner: Mapped["User"] = relationship(back_populates="items")
\ No newline at end of file
+    owner: Mapped["User"] = relationship(back_populates="items")
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+# --- Modelo UserItemStats ---
+# Resumo por dono, mantido incrementalmente pelas escritas de crud.py.
+# Ler estatísticas não depende do tamanho da tabela items.
+class UserItemStats(Base):
+    __tablename__ = "user_item_stats"
+
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Momento da criação de item mais recente deste dono (não recua em exclusões)
+    last_item_created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+# O índice trigram depende da extensão pg_trgm (confiável desde o PostgreSQL 13)
+event.listen(
+    Item.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
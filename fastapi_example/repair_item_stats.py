@@ -0,0 +1,27 @@
+# example_fastapi/repair_item_stats.py
+#
+# Reconstrói a tabela de resumo user_item_stats a partir da tabela items.
+# Use após cargas feitas fora da API ou restaurações de backup. Na primeira
+# implantação, o preenchimento é feito pela migração 0003 (fastapi_example.migrate).
+#
+# Execute a partir da raiz do repositório:
+#   python -m fastapi_example.repair_item_stats
+
+# Importações de módulos locais
+from . import crud, models
+from .database import SessionLocal, engine
+
+def main():
+    # Garante que a tabela de resumo exista antes da reconstrução
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        # A reconstrução é uma escrita: força o primário mesmo com réplicas
+        with db.use_primary():
+            donos = crud.rebuild_item_stats(db)
+    finally:
+        db.close()
+    print(f"Resumo reconstruído: {donos} donos com itens.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# example_fastapi/responses.py
+
+# Importações de bibliotecas externas
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+# Importações de módulos locais
+from . import schemas
+
+# Adaptadores criados uma única vez: validam a página inteira em uma só chamada
+ITEM_ROWS_ADAPTER = TypeAdapter(list[schemas.ItemRow])
+USER_ROWS_ADAPTER = TypeAdapter(list[schemas.UserRow])
+USER_ITEM_COUNT_ROWS_ADAPTER = TypeAdapter(list[schemas.UserItemCountRow])
+ITEM_STATS_ROWS_ADAPTER = TypeAdapter(list[schemas.ItemStatsRow])
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Resposta JSON serializada com orjson. Aceita também conteúdo que já
+    está em bytes (é enviado como está).
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        return orjson.dumps(content)
+
+
+def rows_response(adapter: TypeAdapter, rows) -> FastJSONResponse:
+    """
+    Monta a resposta de uma listagem a partir de linhas (RowMapping) do banco:
+    uma validação para a lista toda e serialização direta para bytes.
+    """
+    return FastJSONResponse(adapter.validate_python(rows))
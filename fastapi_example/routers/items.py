@@ -2,15 +2,20 @@
 
 # Importações de bibliotecas externas
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 # Importações de módulos locais
 from .. import models, schemas, crud, auth
 from ..database import get_db
+from ..responses import FastJSONResponse, ITEM_ROWS_ADAPTER, ITEM_STATS_ROWS_ADAPTER, rows_response
+from ..etags import (
+    item_versions, item_etag, page_etag, http_date, etag_matches, cache_headers, not_modified,
+)
 
 # Definição das dependências
 DBDependency = Annotated[Session, Depends(get_db)]
 CurrentUserDependency = Annotated[models.User, Depends(auth.get_current_user)]
+IfNoneMatchHeader = Annotated[str | None, Header()]
 
 # 1. Cria o APIRouter
 router = APIRouter(prefix="/items", tags=["Items"])
@@ -25,18 +30,92 @@ def create_item_for_current_user(
 ):
     return crud.create_user_item(db=db, item=item, user_id=current_user.id)
 
-# READ ALL Items
-@router.get("/", response_model=list[schemas.Item])
-def read_items(db: DBDependency, current_user: CurrentUserDependency, skip: int = 0, limit: int = 100):
-    items = crud.get_items(db, skip=skip, limit=limit)
-    return items
+# READ ALL Items (caminho rápido: linhas + TypeAdapter + orjson)
+@router.get("/", response_model=list[schemas.Item], response_class=FastJSONResponse)
+def read_items(
+    db: DBDependency,
+    current_user: CurrentUserDependency,
+    skip: int = 0,
+    limit: int = 100,
+    if_none_match: IfNoneMatchHeader = None,
+):
+    page_key = (skip, limit)
+    if if_none_match:
+        # 1. Sem consulta ao banco, se a ETag da página ainda está no cache em memória
+        cached = item_versions.get_page(page_key)
+        if cached and etag_matches(if_none_match, cached[0]):
+            return not_modified(*cached)
+        # 2. Consulta leve: só (id, versão) da página, sem montar o corpo
+        versions = crud.get_page_versions(db, skip=skip, limit=limit)
+        etag = page_etag(skip, limit, ((row.id, row.version) for row in versions))
+        last_modified = http_date(max((row.updated_at for row in versions), default=None))
+        item_versions.set_page(page_key, etag, last_modified)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, last_modified)
+
+    rows = crud.get_item_rows(db, skip=skip, limit=limit)
+    etag = page_etag(skip, limit, ((row["id"], row["version"]) for row in rows))
+    last_modified = http_date(max((row["updated_at"] for row in rows), default=None))
+    item_versions.set_page(page_key, etag, last_modified)
+    response = rows_response(ITEM_ROWS_ADAPTER, rows)
+    response.headers.update(cache_headers(etag, last_modified))
+    return response
+
+# STATS de Itens por dono (lidas da tabela de resumo, sem varrer items)
+@router.get("/stats", response_model=list[schemas.ItemStats], response_class=FastJSONResponse)
+def read_item_stats(
+    db: DBDependency,
+    current_user: CurrentUserDependency,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 100,
+):
+    total_items, total_owners = crud.get_item_stats_totals(db)
+    rows = crud.get_item_stats_rows(db, skip=skip, limit=limit)
+    response = rows_response(ITEM_STATS_ROWS_ADAPTER, rows)
+    response.headers["X-Total-Items"] = str(total_items)
+    response.headers["X-Total-Owners"] = str(total_owners)
+    return response
+
+# SEARCH Items (declarada antes de /{item_id} para não ser capturada por ela)
+@router.get("/search", response_model=list[schemas.ItemSearchResult])
+def search_items(
+    db: DBDependency,
+    current_user: CurrentUserDependency,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    fuzzy: bool = False, # True: prefixo/aproximada por trigram no título
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+):
+    results = crud.search_items(db, q=q, skip=skip, limit=limit, fuzzy=fuzzy)
+    return [
+        schemas.ItemSearchResult(id=item.id, title=item.title, description=item.description,
+                                 owner_id=item.owner_id, rank=rank)
+        for item, rank in results
+    ]
 
 # READ ONE Item
 @router.get("/{item_id}", response_model=schemas.Item)
-def read_item(item_id: int, db: DBDependency):
+def read_item(item_id: int, db: DBDependency, response: Response, if_none_match: IfNoneMatchHeader = None):
+    if if_none_match:
+        # 1. Sem consulta ao banco, se a versão ainda está no cache em memória
+        cached = item_versions.get_item(item_id)
+        if cached and etag_matches(if_none_match, cached[0]):
+            return not_modified(*cached)
+        # 2. Consulta leve: só a versão e a data de alteração
+        version = crud.get_item_version(db, item_id=item_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        etag, last_modified = item_etag(item_id, version.version), http_date(version.updated_at)
+        item_versions.set_item(item_id, etag, last_modified)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, last_modified)
+
     item = crud.get_item(db, item_id=item_id)
     if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
+    etag, last_modified = item_etag(item.id, item.version), http_date(item.updated_at)
+    item_versions.set_item(item.id, etag, last_modified)
+    response.headers.update(cache_headers(etag, last_modified))
     return item
 
 # DELETE Item (Protegido)
@@ -46,12 +125,11 @@ def delete_item(
     db: DBDependency, 
     current_user: CurrentUserDependency # Requer autenticação
 ):
-    item = crud.get_item(db, item_id=item_id)
-    if item is None:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    # Validação de propriedade: só pode deletar seu próprio item
-    if item.owner_id != current_user.id:
+    # Validação de propriedade: só pode deletar seu próprio item.
+    # As duas verificações leem apenas índices, sem carregar o Item.
+    if not crud.item_owned_by(db, item_id=item_id, user_id=current_user.id):
+        if not crud.item_exists(db, item_id=item_id):
+            raise HTTPException(status_code=404, detail="Item not found")
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this item")
 
-    crud.delete_item(db, item)
\ No newline at end of file
+    crud.delete_item_by_id(db, item_id=item_id, user_id=current_user.id)
\ No newline at end of file
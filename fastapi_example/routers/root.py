@@ -2,6 +2,8 @@
 
 # Importações de bibliotecas externas
 from fastapi import APIRouter
+# Importações de módulos locais
+from ..admission import limiter
 
 # 1. Cria o APIRouter
 router = APIRouter(tags=["General"])
@@ -23,6 +25,24 @@ async def root_info():
         "endpoints": {
             "auth": "/users/token",
             "users": "/users/",
-            "items": "/items/"
+            "items": "/items/",
+            "health": "/health",
+            "admission_metrics": "/metrics/admission"
         }
-    }
\ No newline at end of file
+    }
+
+@router.get("/health")
+async def health():
+    """
+    Verificação de vida do processo (não consulta o banco).
+    Tem prioridade máxima no controle de admissão.
+    """
+    return {"status": "ok"}
+
+@router.get("/metrics/admission")
+async def admission_metrics():
+    """
+    Limite de concorrência atual, requisições em andamento, rejeitadas e
+    latência por rota do controle de admissão.
+    """
+    return limiter.snapshot()
\ No newline at end of file
@@ -2,12 +2,15 @@
 
 # Importações de bibliotecas externas
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 # Importações de módulos locais
 from .. import models, schemas, crud, auth
 from ..database import get_db
+from ..responses import (
+    FastJSONResponse, ITEM_ROWS_ADAPTER, USER_ROWS_ADAPTER, USER_ITEM_COUNT_ROWS_ADAPTER, rows_response,
+)
 
 # Definição das dependências (Repetição necessária para evitar importação circular)
 DBDependency = Annotated[Session, Depends(get_db)]
@@ -49,8 +52,33 @@ def create_user(user: schemas.UserCreate, db: DBDependency):
 def read_users_me(current_user: CurrentUserDependency):
     return current_user
 
+# Rota Protegida para listar os itens do usuário logado
+@router.get("/me/items", response_model=list[schemas.Item], response_class=FastJSONResponse)
+def read_my_items(
+    db: DBDependency,
+    current_user: CurrentUserDependency,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
+):
+    # Uma consulta no índice (owner_id, id), sem acessar current_user.items (lazy load)
+    rows = crud.get_user_item_rows(db, user_id=current_user.id, skip=skip, limit=limit)
+    return rows_response(ITEM_ROWS_ADAPTER, rows)
+
+# Rota para listar os usuários com a quantidade de itens de cada um (Protegida)
+@router.get("/with-item-count", response_model=list[schemas.UserWithItemCount],
+            response_class=FastJSONResponse)
+def read_users_with_item_count(
+    db: DBDependency,
+    current_user: CurrentUserDependency,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=100)] = 100,
+):
+    # Uma única consulta agregada, qualquer que seja o número de usuários e itens
+    rows = crud.get_user_rows_with_item_count(db, skip=skip, limit=limit)
+    return rows_response(USER_ITEM_COUNT_ROWS_ADAPTER, rows)
+
 # Rota para listar todos os usuários (Protegida)
-@router.get("/", response_model=list[schemas.User])
+@router.get("/", response_model=list[schemas.User], response_class=FastJSONResponse)
 def read_users(
     db: DBDependency,
     current_user: CurrentUserDependency, # Requer que o usuário esteja logado
@@ -68,8 +96,9 @@ def read_users(
     # if not current_user.is_admin:
     #     raise HTTPException(status_code=403, detail="Acesso negado")
         
-    users = db.query(models.User).offset(skip).limit(limit).all()
-    return users
+    # Caminho rápido: só as colunas da resposta, validadas e serializadas de uma vez
+    rows = crud.get_user_rows(db, skip=skip, limit=limit)
+    return rows_response(USER_ROWS_ADAPTER, rows)
 
 # Rota de Alteração (UPDATE/PATCH) de Usuário
 @router.patch("/{user_id}", response_model=schemas.User)
@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing_extensions import TypedDict
 from pydantic import BaseModel, ConfigDict, EmailStr
 
 # --- Esquemas de Usuário ---
@@ -14,6 +16,9 @@ class User(UserBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class UserWithItemCount(User):
+    item_count: int
+
 class UserUpdate(BaseModel):
     # Todos os campos são opcionais, exceto se você definir um Pydantic Field com '...'
     # O email pode ser opcional.
@@ -40,4 +45,38 @@ class Item(ItemBase):
     id: int
     owner_id: int
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ItemStats(BaseModel):
+    owner_id: int
+    item_count: int
+    last_item_created_at: datetime | None = None
+
+class ItemSearchResult(Item):
+    # Relevância do item para o termo buscado (maior é melhor)
+    rank: float
+
+# --- Linhas para o caminho rápido de listagem ---
+# TypedDicts validam para dicts simples (sem instanciar modelos Pydantic),
+# que são serializados diretamente pelo orjson.
+# typing_extensions.TypedDict (instalado com o pydantic): com typing.TypedDict,
+# o pydantic recusa o schema em Python < 3.12.
+
+class ItemRow(TypedDict):
+    id: int
+    title: str
+    description: str | None
+    owner_id: int
+
+class UserRow(TypedDict):
+    id: int
+    email: str
+    is_active: bool
+
+class UserItemCountRow(UserRow):
+    item_count: int
+
+class ItemStatsRow(TypedDict):
+    owner_id: int
+    item_count: int
+    last_item_created_at: datetime | None
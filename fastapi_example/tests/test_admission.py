@@ -0,0 +1,67 @@
+# example_fastapi/tests/test_admission.py
+#
+# Simulações do limite adaptativo (sem servidor nem banco de dados).
+
+# Importações de bibliotecas externas
+import random
+import pytest
+# Importações de módulos locais
+from fastapi_example import admission
+from fastapi_example.admission import AdaptiveLimiter, MIN_LIMIT, MAX_LIMIT
+
+ROTA = "GET /items/"
+
+
+@pytest.fixture(autouse=True)
+def relogio(monkeypatch):
+    """Relógio simulado: cada requisição concluída avança 10 ms."""
+    agora = [0.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: agora[0])
+    return agora
+
+
+def _simular(limiter, relogio, latencias):
+    """Conclui uma requisição por latência, sempre com o sistema no limite."""
+    for latencia_ms in latencias:
+        relogio[0] += 0.01
+        limiter.in_flight = int(limiter.limit)
+        limiter.release(ROTA, latencia_ms, server_error=False)
+
+
+def test_degradacao_persistente_mantem_o_limite_baixo(relogio):
+    limiter = AdaptiveLimiter()
+    _simular(limiter, relogio, [10.0] * 500)
+    limite_normal = limiter.limit
+
+    # Latência 40x maior e que não volta ao normal
+    _simular(limiter, relogio, [400.0] * 5000)
+    assert limiter.limit == MIN_LIMIT
+    assert limite_normal > MIN_LIMIT
+    # A latência base continua a de antes da degradação
+    assert limiter.routes[ROTA].baseline_ms < 20.0
+
+
+def test_limite_volta_a_crescer_quando_a_latencia_normaliza(relogio):
+    limiter = AdaptiveLimiter()
+    _simular(limiter, relogio, [10.0] * 500)
+    _simular(limiter, relogio, [400.0] * 2000)
+    assert limiter.limit == MIN_LIMIT
+
+    _simular(limiter, relogio, [10.0] * 5000)
+    assert limiter.limit == MAX_LIMIT
+
+
+def test_mistura_de_respostas_rapidas_e_lentas_nao_reduz_o_limite(relogio):
+    # Ex.: 304 de ~1 ms misturados com 200 de 25-45 ms na mesma rota
+    aleatorio = random.Random(1)
+    latencias = [1.0 if aleatorio.random() < 0.7 else aleatorio.uniform(25, 45) for _ in range(5000)]
+    limiter = AdaptiveLimiter()
+    _simular(limiter, relogio, latencias)
+    assert limiter.limit == MAX_LIMIT
+
+
+def test_rotas_desconhecidas_nao_crescem_sem_limite():
+    limiter = AdaptiveLimiter(max_routes=10)
+    for i in range(1000):
+        limiter.record_rejection(f"GET /varredura/{i}")
+    assert len(limiter.routes) == 11  # 10 rotas + o agrupamento das demais
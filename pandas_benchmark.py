@@ -0,0 +1,188 @@
+# Benchmark de acurácia e desempenho do diagnóstico de pandas_example.py.
+#
+# Executa uma validação cruzada k-fold sobre o dataset de sintomas: para cada
+# fold, a matriz de frequência é calculada só com os dados de treino e as
+# linhas separadas são diagnosticadas. Os folds rodam em paralelo (um
+# processo por fold). O resultado sai em JSON, para comparar entre commits.
+#
+# Uso:
+#   python pandas_benchmark.py                       # 5 folds, JSON na saída padrão
+#   python pandas_benchmark.py --folds 10 --saida resultado.json
+#   python pandas_benchmark.py --tamanho-lote 128         # pacientes por lote
+
+import argparse
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import pandas_example
+
+CAMINHO_PADRAO = 'files/SymbiPredict2022.pt-br.csv'
+COLUNA_ALVO = 'Prognóstico'
+TOP_K = 5
+# Pacientes por lote no diagnóstico em lote (a latência p50/p99 é por lote)
+TAMANHO_LOTE = 32
+
+
+def _percentis_ms(latencias):
+    """Resumo (em milissegundos) de uma lista de latências em segundos."""
+    latencias = np.asarray(latencias) * 1000
+    return {
+        "p50_ms": float(np.percentile(latencias, 50)),
+        "p99_ms": float(np.percentile(latencias, 99)),
+        "media_ms": float(latencias.mean()),
+    }
+
+
+def avaliar_fold(caminho_do_arquivo, indices_treino, indices_teste, tamanho_lote=TAMANHO_LOTE):
+    """
+    Treina a matriz com 'indices_treino' e avalia os pacientes de 'indices_teste'.
+    Roda em um processo separado: lê o CSV e usa o estado global do próprio processo.
+    """
+    df = pd.read_csv(caminho_do_arquivo)
+    treino, teste = df.iloc[indices_treino], df.iloc[indices_teste]
+
+    pandas_example.carregar_matriz(treino.groupby(COLUNA_ALVO).sum())
+
+    sintomas = teste.drop(columns=[COLUNA_ALVO])
+    nomes = sintomas.columns.to_numpy()
+    casos = [list(nomes[linha.astype(bool)]) for linha in sintomas.to_numpy()]
+    rotulos = teste[COLUNA_ALVO].tolist()
+
+    # 1. Diagnóstico individual sem cache (todas as chamadas calculam o ranking)
+    tamanho_cache = pandas_example.DIAGNOSTICO_CACHE_MAX
+    pandas_example.DIAGNOSTICO_CACHE_MAX = 0
+    latencias, rankings = [], []
+    try:
+        for caso in casos:
+            inicio = time.perf_counter()
+            ranking = pandas_example.diagnosticar_doenca(caso, top_k=TOP_K)
+            latencias.append(time.perf_counter() - inicio)
+            rankings.append(list(ranking.index))
+    finally:
+        pandas_example.DIAGNOSTICO_CACHE_MAX = tamanho_cache
+
+    # 2. Diagnóstico individual com cache (segunda passada: consultas repetidas)
+    pandas_example.limpar_cache_diagnostico()
+    for caso in casos:
+        pandas_example.diagnosticar_doenca(caso, top_k=TOP_K)
+    latencias_cache = []
+    for caso in casos:
+        inicio = time.perf_counter()
+        pandas_example.diagnosticar_doenca(caso, top_k=TOP_K)
+        latencias_cache.append(time.perf_counter() - inicio)
+
+    # 3. Diagnóstico em lote (lotes de 'tamanho_lote' pacientes, uma chamada por lote)
+    latencias_lote, rankings_lote = [], []
+    for i in range(0, len(casos), tamanho_lote):
+        inicio = time.perf_counter()
+        rankings_lote.extend(pandas_example.diagnosticar_lote(casos[i:i + tamanho_lote], top_k=TOP_K))
+        latencias_lote.append(time.perf_counter() - inicio)
+    tempo_lote = sum(latencias_lote)
+
+    top1 = sum(bool(r) and r[0] == rotulo for r, rotulo in zip(rankings, rotulos))
+    top5 = sum(rotulo in r[:TOP_K] for r, rotulo in zip(rankings, rotulos))
+    top1_lote = sum(bool(r) and r[0] == rotulo for r, rotulo in zip(rankings_lote, rotulos))
+    n = len(casos)
+    return {
+        "pacientes": n,
+        "top1": top1 / n,
+        "top5": top5 / n,
+        "top1_lote": top1_lote / n,
+        # O lote deve produzir exatamente os mesmos rankings do caminho individual
+        "concordancia_lote": sum(a == b for a, b in zip(rankings, rankings_lote)) / n,
+        "individual": {"qps": n / sum(latencias), **_percentis_ms(latencias)},
+        "individual_cache": {"qps": n / sum(latencias_cache), **_percentis_ms(latencias_cache)},
+        "lote": {
+            "tamanho_lote": tamanho_lote,
+            "lotes": len(latencias_lote),
+            "qps": n / tempo_lote,
+            "tempo_total_ms": tempo_lote * 1000,
+            **_percentis_ms(latencias_lote),
+        },
+    }
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar_benchmark(caminho_do_arquivo=CAMINHO_PADRAO, folds=5, workers=None, semente=42,
+                       tamanho_lote=TAMANHO_LOTE):
+    """Executa a validação cruzada k-fold e retorna o relatório (dict)."""
+    total_linhas = len(pd.read_csv(caminho_do_arquivo, usecols=[COLUNA_ALVO]))
+    indices = np.random.default_rng(semente).permutation(total_linhas)
+    partes = np.array_split(indices, folds)
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or min(folds, os.cpu_count() or 1)) as executor:
+        futuros = [
+            executor.submit(
+                avaliar_fold,
+                caminho_do_arquivo,
+                np.concatenate([p for j, p in enumerate(partes) if j != i]),
+                teste,
+                tamanho_lote,
+            )
+            for i, teste in enumerate(partes)
+        ]
+        resultados = [futuro.result() for futuro in futuros]
+    duracao = time.perf_counter() - inicio
+
+    def media(chave, sub=None):
+        valores = [r[chave][sub] if sub else r[chave] for r in resultados]
+        return float(np.mean(valores))
+
+    return {
+        "commit": _commit_atual(),
+        "arquivo": caminho_do_arquivo,
+        "folds": folds,
+        "semente": semente,
+        "tamanho_lote": tamanho_lote,
+        "duracao_s": duracao,
+        "agregado": {
+            "top1": media("top1"),
+            "top5": media("top5"),
+            "top1_lote": media("top1_lote"),
+            "concordancia_lote": media("concordancia_lote"),
+            "individual_qps": media("individual", "qps"),
+            "individual_p99_ms": max(r["individual"]["p99_ms"] for r in resultados),
+            "individual_cache_qps": media("individual_cache", "qps"),
+            "individual_cache_p99_ms": max(r["individual_cache"]["p99_ms"] for r in resultados),
+            "lote_qps": media("lote", "qps"),
+            "lote_p99_ms": max(r["lote"]["p99_ms"] for r in resultados),
+        },
+        "por_fold": resultados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de acurácia e desempenho do diagnóstico.")
+    parser.add_argument('--arquivo', default=CAMINHO_PADRAO, help="Caminho do CSV de sintomas.")
+    parser.add_argument('--folds', type=int, default=5, help="Número de folds da validação cruzada.")
+    parser.add_argument('--workers', type=int, default=None, help="Processos em paralelo (padrão: um por fold).")
+    parser.add_argument('--semente', type=int, default=42, help="Semente do embaralhamento.")
+    parser.add_argument('--tamanho-lote', type=int, default=TAMANHO_LOTE, help="Pacientes por lote no diagnóstico em lote.")
+    parser.add_argument('--saida', default=None, help="Arquivo JSON de saída (padrão: saída padrão).")
+    args = parser.parse_args()
+
+    relatorio = executar_benchmark(args.arquivo, args.folds, args.workers, args.semente, args.tamanho_lote)
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto)
+        print(f"Relatório salvo em {args.saida}")
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
 
 def analisar_dataset_prognostico(caminho_do_arquivo):
@@ -105,12 +110,42 @@ def analisar_sintomas_por_prognostico(caminho_do_arquivo):
 # Isso evita recalcular a matriz toda vez que a função 'diagnosticar' é chamada.
 MATRIZ_FREQUENCIA = None
 
+# Cache (LRU + TTL) dos diagnósticos: o mesmo conjunto de sintomas é
+# consultado repetidamente, e o ranking só muda quando a matriz muda.
+DIAGNOSTICO_CACHE_MAX = 4096         # Conjuntos de sintomas guardados
+DIAGNOSTICO_CACHE_TTL = 3600         # Segundos até uma entrada expirar
+_cache_diagnostico = OrderedDict()   # (sintomas, top_k) -> (expira_em, ranking)
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+_sintomas_validos = frozenset()      # Colunas da matriz, para validar sintomas rapidamente
+_versao_matriz = 0                   # Incrementada a cada nova matriz carregada
+# Representação NumPy da matriz, usada no diagnóstico em lote
+_matriz_numpy = None                 # doenças x sintomas (float64)
+_indice_sintomas = {}                # sintoma -> coluna
+_doencas = np.array([])              # rótulos das linhas
+
+
+def limpar_cache_diagnostico():
+    """Esvazia o cache de diagnósticos e zera as estatísticas."""
+    with _cache_lock:
+        _cache_diagnostico.clear()
+        _cache_stats.update(hits=0, misses=0)
+
+
+def estatisticas_cache_diagnostico():
+    """Retorna hits, misses, taxa de acerto e tamanho do cache de diagnósticos."""
+    with _cache_lock:
+        total = _cache_stats["hits"] + _cache_stats["misses"]
+        return {
+            **_cache_stats,
+            "taxa_acerto": _cache_stats["hits"] / total if total else 0.0,
+            "entradas": len(_cache_diagnostico),
+        }
+
 def preprocessar_dataset(caminho_do_arquivo):
     """
     Lê o dataset e calcula a matriz de frequência de sintomas por prognóstico.
     """
-    global MATRIZ_FREQUENCIA
-    
     try:
         df = pd.read_csv(caminho_do_arquivo)
     except Exception as e:
@@ -123,18 +158,42 @@ def preprocessar_dataset(caminho_do_arquivo):
         return None
 
     # Agrupa e soma: Total de ocorrências de cada sintoma por doença
-    MATRIZ_FREQUENCIA = df.groupby('Prognóstico').sum()
+    carregar_matriz(df.groupby('Prognóstico').sum())
     print("Pré-processamento concluído. Matriz de Frequência de Sintomas calculada.")
     
     return MATRIZ_FREQUENCIA
 
 
-def diagnosticar_doenca(sintomas_do_paciente):
+def carregar_matriz(matriz):
+    """
+    Define a matriz de frequência usada pelo diagnóstico (ex.: uma matriz
+    calculada apenas com os dados de treino) e invalida o cache.
+    """
+    global MATRIZ_FREQUENCIA, _sintomas_validos, _versao_matriz
+    global _matriz_numpy, _indice_sintomas, _doencas
+
+    MATRIZ_FREQUENCIA = matriz
+    _sintomas_validos = frozenset(matriz.columns)
+    _matriz_numpy = matriz.to_numpy(dtype=np.float64)
+    _indice_sintomas = {sintoma: j for j, sintoma in enumerate(matriz.columns)}
+    _doencas = matriz.index.to_numpy()
+    # Rankings calculados com a matriz anterior deixam de valer
+    with _cache_lock:
+        _versao_matriz += 1
+    limpar_cache_diagnostico()
+
+
+def diagnosticar_doenca(sintomas_do_paciente, top_k=None, verbose=False):
     """
     Recebe uma lista de sintomas e retorna o ranking das possíveis doenças.
 
+    Os sintomas são canonicalizados (validados, sem repetição e ordenados), de
+    modo que listas equivalentes compartilham a mesma entrada no cache.
+
     Args:
         sintomas_do_paciente (list): Lista de strings com os sintomas informados.
+        top_k (int, opcional): Retorna apenas as 'top_k' doenças mais prováveis.
+        verbose (bool): Se True, exibe os sintomas analisados.
     
     Returns:
         pd.Series: Ranking de doenças possíveis por pontuação de correspondência.
@@ -146,18 +205,31 @@ def diagnosticar_doenca(sintomas_do_paciente):
         return pd.Series()
 
     # 1. Filtra os sintomas: remove sintomas inválidos (que não estão nas colunas)
-    sintomas_validos = [
-        sintoma for sintoma in sintomas_do_paciente 
-        if sintoma in MATRIZ_FREQUENCIA.columns
-    ]
+    sintomas_validos = tuple(sorted({
+        sintoma for sintoma in sintomas_do_paciente
+        if sintoma in _sintomas_validos
+    }))
 
     if not sintomas_validos:
-        print("Nenhum sintoma válido encontrado no dataset. Por favor, verifique a grafia.")
+        if verbose:
+            print("Nenhum sintoma válido encontrado no dataset. Por favor, verifique a grafia.")
         return pd.Series()
     
-    print(f"\n--- Diagnóstico para {len(sintomas_validos)} Sintoma(s) Válido(s) ---")
-    print(f"Sintomas analisados: {', '.join(sintomas_validos)}")
-
+    if verbose:
+        print(f"\n--- Diagnóstico para {len(sintomas_validos)} Sintoma(s) Válido(s) ---")
+        print(f"Sintomas analisados: {', '.join(sintomas_validos)}")
+
+    chave = (sintomas_validos, top_k)
+    agora = time.monotonic()
+    with _cache_lock:
+        versao = _versao_matriz
+        entrada = _cache_diagnostico.get(chave)
+        if entrada is not None and entrada[0] > agora:
+            _cache_diagnostico.move_to_end(chave)
+            _cache_stats["hits"] += 1
+            # Cópia: quem chama pode alterar a Series sem afetar o cache
+            return entrada[1].copy()
+        _cache_stats["misses"] += 1
 
     # 2. Calcula a Pontuação de Correspondência (Score)
     # A pontuação é a soma da frequência dos sintomas presentes para cada doença.
@@ -165,41 +237,85 @@ def diagnosticar_doenca(sintomas_do_paciente):
     # - Doença A: (Frequência de Coceira em A) + (Frequência de Tremores em A)
     # - Doença B: (Frequência de Coceira em B) + (Frequência de Tremores em B)
     
-    ranking_de_probabilidade = MATRIZ_FREQUENCIA[sintomas_validos].sum(axis=1)
+    ranking_de_probabilidade = MATRIZ_FREQUENCIA[list(sintomas_validos)].sum(axis=1)
 
     # 3. Ordena e Exibe o Resultado
     # Ordena da maior pontuação (mais provável) para a menor
-    ranking_ordenado = ranking_de_probabilidade.sort_values(ascending=False)
+    # (ordenação estável: empates mantêm a ordem da matriz, como em diagnosticar_lote)
+    ranking_ordenado = ranking_de_probabilidade.sort_values(ascending=False, kind="stable")
+    if top_k is not None:
+        ranking_ordenado = ranking_ordenado.head(top_k)
+
+    with _cache_lock:
+        # Não guarda rankings de uma matriz que foi substituída durante o cálculo
+        if versao == _versao_matriz:
+            _cache_diagnostico[chave] = (agora + DIAGNOSTICO_CACHE_TTL, ranking_ordenado)
+            _cache_diagnostico.move_to_end(chave)
+            while len(_cache_diagnostico) > DIAGNOSTICO_CACHE_MAX:
+                _cache_diagnostico.popitem(last=False)
+
+    return ranking_ordenado.copy()
+
+
+
+def diagnosticar_lote(lista_de_sintomas, top_k=5):
+    """
+    Diagnostica vários pacientes de uma vez, com uma multiplicação de matrizes
+    (pacientes x sintomas) @ (sintomas x doenças), sem cache.
+
+    Args:
+        lista_de_sintomas (list): Uma lista de sintomas por paciente.
+        top_k (int): Quantidade de doenças retornadas por paciente.
+
+    Returns:
+        list: Para cada paciente, a lista das 'top_k' doenças mais prováveis
+        (vazia se nenhum sintoma for válido), na mesma ordem de diagnosticar_doenca.
+    """
+    if MATRIZ_FREQUENCIA is None:
+        print("ERRO: A matriz de frequência não foi carregada. Execute 'preprocessar_dataset(caminho)' primeiro.")
+        return []
+
+    presenca = np.zeros((len(lista_de_sintomas), len(_indice_sintomas)), dtype=np.float64)
+    for i, sintomas in enumerate(lista_de_sintomas):
+        for sintoma in sintomas:
+            j = _indice_sintomas.get(sintoma)
+            if j is not None:
+                presenca[i, j] = 1.0
 
-    return ranking_ordenado
+    pontuacoes = presenca @ _matriz_numpy.T
+    ordem = np.argsort(-pontuacoes, axis=1, kind="stable")[:, :top_k]
+    tem_sintoma = presenca.any(axis=1)
+    return [list(_doencas[linha]) if valido else [] for linha, valido in zip(ordem, tem_sintoma)]
 
 
 
 # --- Execução da Função com o seu arquivo ---
-caminho = 'files/SymbiPredict2022.pt-br.csv'
+# (apenas quando o arquivo é executado diretamente, para que as funções possam ser importadas)
+if __name__ == "__main__":
+    caminho = 'files/SymbiPredict2022.pt-br.csv'
 
-# Análise Exploratória Inicial
-#analisar_dataset_prognostico(caminho)
+    # Análise Exploratória Inicial
+    #analisar_dataset_prognostico(caminho)
 
-#analisar_sintomas_por_prognostico(caminho)
+    #analisar_sintomas_por_prognostico(caminho)
 
 
-# 1. Pré-processamento (Executar APENAS uma vez)
-# Isso prepara a base de dados para o diagnóstico
-preprocessar_dataset(caminho)
+    # 1. Pré-processamento (Executar APENAS uma vez)
+    # Isso prepara a base de dados para o diagnóstico
+    preprocessar_dataset(caminho)
 
-# 2. Teste o Diagnóstico
+    # 2. Teste o Diagnóstico
 
-# Exemplo 1: Sintomas de 'Infecção Fúngica'
-sintomas_exemplo_1 = ['Coceira', 'Erupção cutânea', 'Erupções cutâneas nodais']
-ranking_1 = diagnosticar_doenca(sintomas_exemplo_1)
+    # Exemplo 1: Sintomas de 'Infecção Fúngica'
+    sintomas_exemplo_1 = ['Coceira', 'Erupção cutânea', 'Erupções cutâneas nodais']
+    ranking_1 = diagnosticar_doenca(sintomas_exemplo_1, verbose=True)
 
-print("\n\n--- Ranking de Doenças para o Exemplo 1 ---")
-print(ranking_1.head()) # Exibe as 5 doenças com maior score
+    print("\n\n--- Ranking de Doenças para o Exemplo 1 ---")
+    print(ranking_1.head()) # Exibe as 5 doenças com maior score
 
-# Exemplo 2: Sintomas de 'Alergia'
-sintomas_exemplo_2 = ['Espirros contínuos', 'Tremores', 'Calafrios']
-ranking_2 = diagnosticar_doenca(sintomas_exemplo_2)
+    # Exemplo 2: Sintomas de 'Alergia'
+    sintomas_exemplo_2 = ['Espirros contínuos', 'Tremores', 'Calafrios']
+    ranking_2 = diagnosticar_doenca(sintomas_exemplo_2, verbose=True)
 
-print("\n\n--- Ranking de Doenças para o Exemplo 2 ---")
-print(ranking_2.head()) # Exibe as 5 doenças com maior score
+    print("\n\n--- Ranking de Doenças para o Exemplo 2 ---")
+    print(ranking_2.head()) # Exibe as 5 doenças com maior score
@@ -0,0 +1,224 @@
+# Carga do dataset de sintomas (files/SymbiPredict2022.pt-br.csv) no PostgreSQL
+# usando COPY, sem passar pelo pandas.
+#
+# Uso:
+#   python postgresql_copy_example.py                     # carrega e mostra a matriz
+#   python postgresql_copy_example.py --substituir        # apaga os dados antes de carregar
+#                                                         # (sem ela, a carga é recusada se já houver dados)
+#   python postgresql_copy_example.py --arquivo outro.csv --host localhost
+
+import argparse
+import csv
+import time
+
+from psycopg import Error
+
+from postgresql_example import PostgresDB
+
+CAMINHO_PADRAO = 'files/SymbiPredict2022.pt-br.csv'
+COLUNA_ALVO = 'Prognóstico'
+
+# --- Esquema ---
+# Os sintomas são armazenados de forma compacta: cada paciente guarda apenas
+# os índices (smallint[]) dos sintomas presentes, em vez de ~130 colunas 0/1.
+
+SQL_CREATE_SINTOMA = """
+CREATE TABLE IF NOT EXISTS sintoma (
+    id SMALLINT PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+"""
+
+SQL_CREATE_PACIENTE = """
+CREATE TABLE IF NOT EXISTS paciente_sintomas (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    prognostico TEXT NOT NULL,
+    sintomas SMALLINT[] NOT NULL
+);
+"""
+
+# Os índices são removidos antes e recriados depois da carga:
+# construir um índice de uma vez é bem mais rápido que mantê-lo linha a linha.
+SQL_DROP_INDICES = """
+DROP INDEX IF EXISTS idx_paciente_sintomas_prognostico;
+DROP INDEX IF EXISTS idx_paciente_sintomas_sintomas;
+"""
+
+SQL_CREATE_INDICES = """
+CREATE INDEX IF NOT EXISTS idx_paciente_sintomas_prognostico ON paciente_sintomas (prognostico);
+CREATE INDEX IF NOT EXISTS idx_paciente_sintomas_sintomas ON paciente_sintomas USING GIN (sintomas);
+"""
+
+# Soma de ocorrências de cada sintoma por doença (equivalente ao groupby().sum() do pandas)
+SQL_CREATE_VIEW = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS prognostico_sintoma_freq AS
+SELECT p.prognostico, s.sintoma_id, COUNT(*)::INT AS total
+FROM paciente_sintomas p
+CROSS JOIN LATERAL unnest(p.sintomas) AS s(sintoma_id)
+GROUP BY p.prognostico, s.sintoma_id
+WITH NO DATA;
+"""
+
+SQL_CREATE_VIEW_INDICE = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_prognostico_sintoma_freq
+ON prognostico_sintoma_freq (prognostico, sintoma_id);
+"""
+
+# Matriz de frequência completa (uma linha por doença, um valor por sintoma,
+# na ordem das colunas do CSV), calculada inteiramente pelo banco.
+SQL_MATRIZ_FREQUENCIA = """
+SELECT d.prognostico,
+       array_agg(COALESCE(f.total, 0) ORDER BY s.id) AS frequencias
+FROM (SELECT DISTINCT prognostico FROM prognostico_sintoma_freq) d
+CROSS JOIN sintoma s
+LEFT JOIN prognostico_sintoma_freq f
+       ON f.prognostico = d.prognostico AND f.sintoma_id = s.id
+GROUP BY d.prognostico
+ORDER BY d.prognostico;
+"""
+
+
+def _nomes_unicos(nomes):
+    """
+    Desambigua nomes repetidos do cabeçalho como o pandas faz ao ler o CSV:
+    a segunda ocorrência de "Dor abdominal" vira "Dor abdominal.1", e assim por diante.
+    """
+    vistos = {}
+    unicos = []
+    for nome in nomes:
+        candidato = nome
+        while candidato in vistos:
+            vistos[nome] += 1
+            candidato = f"{nome}.{vistos[nome]}"
+        vistos.setdefault(candidato, 0)
+        unicos.append(candidato)
+    return unicos
+
+
+def _linhas_compactas(leitor, quantidade_sintomas):
+    """
+    Converte cada linha do CSV em (prognóstico, [índices dos sintomas presentes]).
+    """
+    for numero, linha in enumerate(leitor, start=2):
+        if not linha:
+            continue
+        if len(linha) != quantidade_sintomas + 1:
+            raise ValueError(f"Linha {numero}: esperado {quantidade_sintomas + 1} colunas, encontrado {len(linha)}.")
+        prognostico = linha[0]
+        sintomas = [i for i, valor in enumerate(linha[1:]) if valor.strip() not in ('', '0')]
+        yield prognostico, sintomas
+
+
+def carregar_sintomas(db, caminho_do_arquivo=CAMINHO_PADRAO, substituir=False):
+    """
+    Cria o esquema e carrega o CSV via COPY (formato binário), linha a linha.
+
+    Args:
+        db (PostgresDB): Conexão aberta (o commit é feito ao sair do 'with').
+        caminho_do_arquivo (str): O caminho para o arquivo CSV.
+        substituir (bool): Se True, apaga os dados existentes antes da carga.
+            Se False e a tabela já tiver pacientes, a carga é recusada (evita
+            carregar uma segunda cópia de cada paciente).
+
+    Returns:
+        int: Número de pacientes carregados.
+    """
+    with open(caminho_do_arquivo, newline='', encoding='utf-8') as arquivo:
+        leitor = csv.reader(arquivo)
+        cabecalho = next(leitor)
+        if not cabecalho or cabecalho[0] != COLUNA_ALVO:
+            raise ValueError(f"A primeira coluna do arquivo deve ser '{COLUNA_ALVO}'.")
+        nomes_sintomas = _nomes_unicos(cabecalho[1:])
+
+        db.execute_query(SQL_CREATE_SINTOMA)
+        db.execute_query(SQL_CREATE_PACIENTE)
+        if substituir:
+            db.execute_query("TRUNCATE paciente_sintomas, sintoma;")
+        elif db.execute_query("SELECT EXISTS (SELECT 1 FROM paciente_sintomas);", fetch_results=True)[0][0]:
+            raise ValueError("A tabela paciente_sintomas já possui dados; use --substituir para recarregar.")
+        db.execute_query(SQL_DROP_INDICES)
+
+        # Dicionário de sintomas: o índice no array corresponde à coluna do CSV.
+        # São poucas linhas, então um upsert simples basta (permite recargas).
+        db.cursor.executemany(
+            "INSERT INTO sintoma (id, nome) VALUES (%s, %s) "
+            "ON CONFLICT (id) DO UPDATE SET nome = EXCLUDED.nome;",
+            list(enumerate(nomes_sintomas)),
+        )
+
+        total = 0
+        with db.cursor.copy(
+            "COPY paciente_sintomas (prognostico, sintomas) FROM STDIN (FORMAT BINARY)"
+        ) as copy:
+            copy.set_types(["text", "int2[]"])
+            for prognostico, sintomas in _linhas_compactas(leitor, len(nomes_sintomas)):
+                copy.write_row((prognostico, sintomas))
+                total += 1
+
+    db.execute_query(SQL_CREATE_INDICES)
+    db.execute_query(SQL_CREATE_VIEW)
+    db.execute_query(SQL_CREATE_VIEW_INDICE)
+    db.execute_query("REFRESH MATERIALIZED VIEW prognostico_sintoma_freq;")
+    db.execute_query("ANALYZE paciente_sintomas;")
+    return total
+
+
+def matriz_frequencia(db):
+    """
+    Retorna os nomes dos sintomas e a matriz de frequência calculada pelo banco.
+
+    Returns:
+        tuple: (lista de sintomas, lista de (prognóstico, [frequências])).
+    """
+    nomes = [nome for (nome,) in db.execute_query(
+        "SELECT nome FROM sintoma ORDER BY id;", fetch_results=True)]
+    return nomes, db.execute_query(SQL_MATRIZ_FREQUENCIA, fetch_results=True)
+
+
+# =========================================================================
+# APLICAÇÃO DE EXEMPLO
+# =========================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Carrega o dataset de sintomas no PostgreSQL via COPY.")
+    parser.add_argument('--arquivo', default=CAMINHO_PADRAO, help="Caminho do CSV de sintomas.")
+    parser.add_argument('--substituir', action='store_true', help="Apaga os dados existentes antes da carga.")
+    parser.add_argument('--dbname', default='postgres')
+    parser.add_argument('--user', default='postgres')
+    parser.add_argument('--password', default='postgres')
+    parser.add_argument('--host', default='py-postgres')  # Use 'localhost' se estiver rodando localmente
+    parser.add_argument('--port', default='5432')
+    args = parser.parse_args()
+
+    db_params = {
+        'dbname': args.dbname,
+        'user': args.user,
+        'password': args.password,
+        'host': args.host,
+        'port': args.port,
+    }
+
+    print(f"--- Carregando {args.arquivo} ---")
+    try:
+        with PostgresDB(**db_params) as db:
+            inicio = time.perf_counter()
+            total = carregar_sintomas(db, args.arquivo, substituir=args.substituir)
+            print(f"{total} pacientes carregados em {time.perf_counter() - inicio:.2f} s.")
+
+            sintomas, matriz = matriz_frequencia(db)
+            print(f"\nMatriz de frequência: {len(matriz)} doenças x {len(sintomas)} sintomas")
+            for prognostico, frequencias in matriz[:5]:
+                principais = sorted(zip(frequencias, sintomas), reverse=True)[:3]
+                print(f"- {prognostico}: " + ", ".join(f"{nome} ({freq})" for freq, nome in principais))
+
+    except ConnectionError as e:
+        print(f"Não foi possível continuar as operações: {e}")
+    except (OSError, ValueError) as e:
+        print(f"ERRO na carga: {e}")
+    except Error as e:
+        print(f"Ocorreu um erro SQL durante a execução: {e}")
+
+    print("--- Fim da Carga ---")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,427 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
 import psycopg
-from psycopg import Error
+from psycopg import Error, sql
+
+
+# =========================================================================
+# CACHE DE RESULTADOS DE CONSULTAS
+# =========================================================================
+
+# Expressões usadas para classificar a consulta e descobrir as tabelas envolvidas.
+# É uma análise leve (não é um parser SQL completo), suficiente para os casos comuns.
+# Literais entre aspas (inclusive $$...$$) são capturados primeiro para que espaços
+# e '--' dentro de strings sejam preservados; comentários e espaços fora delas viram um espaço.
+_RE_NORMALIZACAO = re.compile(
+    r"(\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$|'(?:[^']|'')*'|\"[^\"]*\")|(?:\s+|--[^\n]*|/\*.*?\*/)+",
+    re.DOTALL,
+)
+# Literais, identificadores entre aspas e comentários, para que o conteúdo
+# deles ('update', "delete", -- drop) não seja lido como palavra-chave.
+_RE_LITERAIS = re.compile(
+    r"(?P<texto>\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?\$(?P=tag)\$"
+    r"|(?<![\w$])[Ee]'(?:[^'\\]|''|\\.)*'"
+    r"|'(?:[^']|'')*')"
+    r"|(?P<identificador>\"(?:[^\"]|\"\")*\")"
+    r"|(?P<comentario>--[^\n]*|/\*.*?\*/)",
+    re.DOTALL,
+)
+_NOME_TABELA = r'((?:"[^"]+"|[\w$]+)(?:\s*\.\s*(?:"[^"]+"|[\w$]+))?)'
+_RE_INICIO_LEITURA = re.compile(r"\b(?:FROM|JOIN)\b", re.IGNORECASE)
+_RE_PREFIXO_ITEM = re.compile(r"\s*(?:(?:ONLY|LATERAL)\b\s*)?", re.IGNORECASE)
+_RE_ITEM_TABELA = re.compile(_NOME_TABELA)
+# Palavras que encerram um item do FROM (não podem ser confundidas com um alias)
+_PALAVRAS_APOS_ITEM = (
+    "WHERE|GROUP|ORDER|HAVING|LIMIT|OFFSET|WINDOW|UNION|INTERSECT|EXCEPT|FETCH|FOR|"
+    "JOIN|INNER|LEFT|RIGHT|FULL|CROSS|NATURAL|ON|USING|TABLESAMPLE|RETURNING"
+)
+_RE_FIM_CONDICAO = re.compile(r"(?:" + _PALAVRAS_APOS_ITEM + r")\b", re.IGNORECASE)
+_RE_CONDICAO_JOIN = re.compile(r"(?:ON|USING)\b", re.IGNORECASE)
+_RE_ALIAS = re.compile(r"(?:\s+AS)?\s+(?!(?:" + _PALAVRAS_APOS_ITEM + r")\b)(?:\"[^\"]+\"|\w+)", re.IGNORECASE)
+# Funções cujo resultado muda a cada chamada ou que têm efeitos colaterais,
+# e cláusulas de bloqueio: consultas com elas nunca vão para o cache.
+_RE_VOLATIL = re.compile(
+    r"\b(?:nextval|setval|currval|lastval|now|clock_timestamp|statement_timestamp|"
+    r"transaction_timestamp|timeofday|current_timestamp|current_date|current_time|"
+    r"localtime|localtimestamp|random|gen_random_uuid|uuid_generate_\w+|set_config|"
+    r"current_setting|pg_\w+|txid_\w+|lo_\w+|dblink\w*)\b|\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE)\b",
+    re.IGNORECASE,
+)
+_RE_TABELAS_ESCRITA = re.compile(
+    r"\b(?:INSERT\s+INTO|UPDATE(?:\s+ONLY)?|DELETE\s+FROM(?:\s+ONLY)?|"
+    r"TRUNCATE(?:\s+TABLE)?(?:\s+ONLY)?|ALTER\s+TABLE(?:\s+IF\s+EXISTS)?(?:\s+ONLY)?|"
+    r"DROP\s+TABLE(?:\s+IF\s+EXISTS)?|REFRESH\s+MATERIALIZED\s+VIEW(?:\s+CONCURRENTLY)?|"
+    r"COPY)\s+" + _NOME_TABELA,
+    re.IGNORECASE,
+)
+_RE_ESCRITA = re.compile(
+    r"\b(?:INSERT|UPDATE|DELETE|TRUNCATE|ALTER|DROP|CREATE|COPY|REFRESH|MERGE|GRANT|REVOKE)\b",
+    re.IGNORECASE,
+)
+
+
+def normalizar_sql(query):
+    """
+    Normaliza uma consulta SQL para uso como chave de cache:
+    remove comentários, colapsa espaços e descarta o ';' final.
+    """
+    query = _RE_NORMALIZACAO.sub(lambda m: m.group(1) or " ", query)
+    return query.strip().rstrip(";").strip()
+
+
+def _nome_tabela(nome):
+    """Remove aspas e o esquema de um nome de tabela ('public."Cliente"' -> 'cliente')."""
+    nome = nome.split(".")[-1].strip()
+    if nome.startswith('"'):
+        return nome.strip('"')
+    return nome.lower()
+
+
+def _fim_parenteses(query, inicio):
+    """Posição logo após o ')' que fecha o '(' em 'inicio' (ignora literais)."""
+    nivel, i, aspas = 0, inicio, None
+    while i < len(query):
+        c = query[i]
+        if aspas:
+            if c == aspas:
+                aspas = None
+        elif c in "'\"":
+            aspas = c
+        elif c == "(":
+            nivel += 1
+        elif c == ")":
+            nivel -= 1
+            if nivel == 0:
+                return i + 1
+        i += 1
+    return len(query)
+
+
+def _proxima_virgula(query, pos):
+    """
+    A partir de uma condição de JOIN (ON/USING), retorna a posição logo após
+    a próxima vírgula da lista do FROM, ou None se a lista terminar antes.
+    """
+    nivel, i = 0, pos
+    while i < len(query):
+        c = query[i]
+        if c in "'\"":
+            i = query.find(c, i + 1)
+            if i < 0:
+                return None
+        elif c == "(":
+            nivel += 1
+        elif c == ")":
+            if nivel == 0:
+                return None
+            nivel -= 1
+        elif nivel == 0:
+            if c == ",":
+                return i + 1
+            if _RE_FIM_CONDICAO.match(query, i) and (i == 0 or not (query[i - 1].isalnum() or query[i - 1] == "_")):
+                return None
+        i += 1
+    return None
+
+
+def _analisar_leitura(query):
+    """
+    Percorre as listas de FROM/JOIN (inclusive 'FROM a, b') e retorna
+    (tabelas, completo). 'completo' é False quando algum item não pôde ser
+    reconhecido como tabela (ex.: uma função como generate_series(...)).
+    Subconsultas entre parênteses são puladas: os FROM internos são lidos
+    na própria varredura.
+    """
+    tabelas, completo = set(), True
+    for inicio in _RE_INICIO_LEITURA.finditer(query):
+        pos = inicio.end()
+        while True:
+            prefixo = _RE_PREFIXO_ITEM.match(query, pos)
+            pos = prefixo.end()
+            if query.startswith("(", pos):
+                pos = _fim_parenteses(query, pos)
+            else:
+                item = _RE_ITEM_TABELA.match(query, pos)
+                if item is None:
+                    completo = False
+                    break
+                pos = item.end()
+                if query[pos:].lstrip().startswith("("):
+                    completo = False  # Chamada de função no FROM
+                    break
+                tabelas.add(_nome_tabela(item.group(1)))
+            alias = _RE_ALIAS.match(query, pos)
+            if alias:
+                pos = alias.end()
+                if query[pos:].lstrip().startswith("("):
+                    # Lista de nomes de colunas do alias: t(a, b)
+                    pos = _fim_parenteses(query, query.index("(", pos))
+            resto = query[pos:].lstrip()
+            if resto.startswith(","):
+                pos = len(query) - len(resto) + 1
+                continue
+            condicao = _RE_CONDICAO_JOIN.match(resto)
+            if condicao:
+                # 'a JOIN b ON ..., c': a lista continua depois da condição
+                pos = _proxima_virgula(query, len(query) - len(resto) + condicao.end())
+                if pos is not None:
+                    continue
+            break
+    return tabelas, completo
+
+
+def _sem_literais(query, identificadores=False):
+    """
+    Troca cada literal de texto por '' e cada comentário por um espaço. Com
+    identificadores=True, os identificadores entre aspas também viram "".
+    """
+    def substituir(m):
+        if m.group("texto"):
+            return "''"
+        if m.group("identificador"):
+            return '""' if identificadores else m.group("identificador")
+        return " "
+    return _RE_LITERAIS.sub(substituir, query)
+
+
+def tabelas_lidas(query):
+    """Retorna o conjunto de tabelas referenciadas em FROM/JOIN."""
+    return _analisar_leitura(_sem_literais(query))[0]
+
+
+def tabelas_cacheaveis(query):
+    """
+    Retorna as tabelas lidas por uma consulta que pode ir para o cache, ou
+    None se ela não pode: não é somente leitura, chama funções voláteis ou
+    com efeitos colaterais (nextval, now, pg_cancel_backend...), não lê
+    nenhuma tabela, ou tem itens no FROM que não foram reconhecidos (e uma
+    escrita neles não invalidaria a entrada).
+    """
+    if not eh_somente_leitura(query) or _RE_VOLATIL.search(_sem_literais(query, identificadores=True)):
+        return None
+    tabelas, completo = _analisar_leitura(_sem_literais(query))
+    if not completo or not tabelas:
+        return None
+    return tabelas
+
+
+def tabelas_escritas(query):
+    """Retorna o conjunto de tabelas alteradas por um comando DML/DDL."""
+    return {_nome_tabela(nome) for nome in _RE_TABELAS_ESCRITA.findall(_sem_literais(query))}
+
+
+def eh_somente_leitura(query):
+    """Indica se a consulta é um SELECT/WITH sem comandos de escrita embutidos."""
+    codigo = _sem_literais(query, identificadores=True)
+    inicio = (codigo.lstrip("( ").split(None, 1) or [""])[0].upper()
+    return inicio in ("SELECT", "WITH", "VALUES", "TABLE") and not _RE_ESCRITA.search(codigo)
+
+
+def contem_escrita(query):
+    """Indica se a consulta contém algum comando que altera dados ou esquema."""
+    return _RE_ESCRITA.search(_sem_literais(query, identificadores=True)) is not None
+
+
+def _congelar(valor):
+    """Converte parâmetros (listas, dicts) em uma estrutura imutável e 'hashable'."""
+    if isinstance(valor, dict):
+        return tuple(sorted((k, _congelar(v)) for k, v in valor.items()))
+    if isinstance(valor, (list, tuple, set)):
+        return tuple(_congelar(v) for v in valor)
+    return valor
+
+
+def _tamanho_aproximado(linhas):
+    """Estimativa (em bytes) da memória ocupada por uma lista de tuplas."""
+    total = sys.getsizeof(linhas)
+    for linha in linhas:
+        total += sys.getsizeof(linha)
+        for valor in linha:
+            total += sys.getsizeof(valor)
+    return total
+
+
+class QueryCache:
+    """
+    Cache de leitura (read-through) para resultados de consultas SELECT.
+
+    - As entradas são indexadas por (SQL normalizado, parâmetros).
+    - Cada entrada expira após 'ttl' segundos.
+    - O tamanho é limitado por 'max_entradas' e 'max_bytes' (política LRU).
+    - Escritas feitas pelo PostgresDB invalidam as entradas que leem as
+      tabelas alteradas. Opcionalmente, a invalidação pode ser propagada
+      entre processos via LISTEN/NOTIFY do PostgreSQL.
+
+    O mesmo objeto pode ser compartilhado entre várias instâncias de PostgresDB
+    (por exemplo, um 'with PostgresDB(...)' por requisição).
+    """
+
+    def __init__(self, ttl=60, max_entradas=256, max_bytes=64 * 1024 * 1024, canal_notify=None):
+        """
+        - ttl: Tempo de vida de cada entrada, em segundos.
+        - max_entradas: Número máximo de resultados armazenados.
+        - max_bytes: Memória máxima estimada para os resultados armazenados.
+        - canal_notify: Canal do LISTEN/NOTIFY usado para propagar invalidações (opcional).
+        """
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.canal_notify = canal_notify
+        self._entradas = OrderedDict()  # chave -> (expira_em, tabelas, linhas, tamanho)
+        self._por_tabela = {}  # tabela -> conjunto de chaves
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._ouvinte = None
+        self._parar_ouvinte = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.invalidacoes = 0
+        self.remocoes = 0
+
+    @staticmethod
+    def chave(query, params=None):
+        """Monta a chave do cache para uma consulta e seus parâmetros."""
+        return (normalizar_sql(query), _congelar(params))
+
+    def get(self, chave):
+        """Retorna as linhas armazenadas para a chave, ou None se ausente/expirada."""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            if entrada[0] < time.monotonic():
+                self._remover(chave)
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return entrada[2]
+
+    def set(self, chave, linhas, tabelas, tamanho=None):
+        """
+        Armazena o resultado de uma consulta, aplicando a política LRU.
+        - tamanho: Tamanho em bytes, se já conhecido (ex.: de um DataFrame).
+        """
+        if tamanho is None:
+            tamanho = _tamanho_aproximado(linhas)
+        if tamanho > self.max_bytes:
+            return  # Resultado grande demais para o cache
+        with self._lock:
+            if chave in self._entradas:
+                self._remover(chave)
+            self._entradas[chave] = (time.monotonic() + self.ttl, frozenset(tabelas), linhas, tamanho)
+            self._bytes += tamanho
+            for tabela in tabelas:
+                self._por_tabela.setdefault(tabela, set()).add(chave)
+            while self._entradas and (
+                len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes
+            ):
+                self._remover(next(iter(self._entradas)))
+                self.remocoes += 1
+
+    def invalidate_tables(self, tabelas):
+        """Remove todas as entradas que leem alguma das tabelas informadas."""
+        with self._lock:
+            for tabela in tabelas:
+                for chave in list(self._por_tabela.get(tabela, ())):
+                    self._remover(chave)
+                    self.invalidacoes += 1
+
+    def clear(self):
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            self.invalidacoes += len(self._entradas)
+            self._entradas.clear()
+            self._por_tabela.clear()
+            self._bytes = 0
+
+    def _remover(self, chave):
+        _, tabelas, _, tamanho = self._entradas.pop(chave)
+        self._bytes -= tamanho
+        for tabela in tabelas:
+            chaves = self._por_tabela.get(tabela)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._por_tabela[tabela]
+
+    def stats(self):
+        """Retorna estatísticas de uso: hits, misses, taxa de acerto e memória."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "taxa_acerto": self.hits / total if total else 0.0,
+                "invalidacoes": self.invalidacoes,
+                "remocoes_lru": self.remocoes,
+            }
+
+    # --- Invalidação via LISTEN/NOTIFY ---
+
+    def start_listener(self, **conn_params):
+        """
+        Inicia uma thread que escuta o canal 'canal_notify' e invalida as
+        tabelas recebidas no payload das notificações (um nome de tabela, ou
+        '*' para limpar tudo). Os parâmetros são os mesmos de psycopg.connect.
+        """
+        if self.canal_notify is None:
+            raise ValueError("Defina 'canal_notify' para usar LISTEN/NOTIFY.")
+        if self._ouvinte is not None:
+            return
+        self._parar_ouvinte.clear()
+        self._ouvinte = threading.Thread(
+            target=self._escutar, kwargs=conn_params, name="query-cache-listener", daemon=True
+        )
+        self._ouvinte.start()
+
+    def stop_listener(self):
+        """Sinaliza a thread de LISTEN para encerrar."""
+        self._parar_ouvinte.set()
+        if self._ouvinte is not None:
+            self._ouvinte.join(timeout=5)
+            self._ouvinte = None
+
+    def _escutar(self, **conn_params):
+        try:
+            with psycopg.connect(autocommit=True, **conn_params) as conn:
+                conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.canal_notify)))
+                while not self._parar_ouvinte.is_set():
+                    # timeout curto para poder verificar o sinal de parada periodicamente
+                    for notificacao in conn.notifies(timeout=1.0):
+                        if notificacao.payload == "*":
+                            self.clear()
+                        else:
+                            self.invalidate_tables({notificacao.payload})
+        except Error as e:
+            print(f"Ouvinte de invalidação do cache encerrado: {e}")
+        finally:
+            self._ouvinte = None
+
+    def publish_invalidation(self, conn, tabelas):
+        """
+        Publica as tabelas alteradas no canal de notificação. O NOTIFY só é
+        entregue aos ouvintes quando a transação corrente for confirmada.
+        Usa um cursor próprio, para não sobrescrever o resultado do cursor
+        que executou a escrita.
+        """
+        if self.canal_notify is None:
+            return
+        with conn.cursor() as cursor:
+            for tabela in (tabelas or {"*"}):
+                cursor.execute("SELECT pg_notify(%s, %s)", (self.canal_notify, tabela))
+
+
+# =========================================================================
+# CLASSE DE ACESSO AO BANCO
+# =========================================================================
 
 class PostgresDB:
     """
@@ -7,9 +429,10 @@ class PostgresDB:
     com um banco de dados PostgreSQL usando psycopg2.
     """
 
-    def __init__(self, dbname, user, password, host='localhost', port='5432'):
+    def __init__(self, dbname, user, password, host='localhost', port='5432', cache=None):
         """
         Inicializa a classe com os parâmetros de conexão.
+        - cache: Instância opcional de QueryCache para os resultados de SELECT.
         """
         self.dbname = dbname
         self.user = user
@@ -18,6 +441,8 @@ class PostgresDB:
         self.port = port
         self.conn = None # Objeto de conexão
         self.cursor = None # Objeto cursor
+        self.cache = cache # Cache de resultados (opcional)
+        self._tabelas_alteradas = set() # Tabelas escritas na transação corrente
 
     def __enter__(self):
         """
@@ -53,6 +478,12 @@ class PostgresDB:
                 # Se houve exceção, faz o rollback (desfaz as alterações)
                 self.conn.rollback()
                 print(f"Transação desfeita devido ao erro: {exc_val}")
+
+            if self.cache is not None and self._tabelas_alteradas:
+                # Invalida novamente após o commit/rollback: leituras feitas
+                # durante a transação podem ter visto dados não confirmados.
+                self.cache.invalidate_tables(self._tabelas_alteradas)
+            self._tabelas_alteradas = set()
                 
             if self.cursor:
                 self.cursor.close()
@@ -69,6 +500,9 @@ class PostgresDB:
         if not self.cursor:
             raise ConnectionError("A conexão não foi estabelecida ou foi fechada.")
 
+        if self.cache is not None:
+            return self._execute_with_cache(query, params, fetch_results)
+
         try:
             self.cursor.execute(query, params)
             
@@ -83,6 +517,43 @@ class PostgresDB:
             # Não faz o rollback aqui, o __exit__ faz. Apenas relança o erro.
             raise e
 
+    def _execute_with_cache(self, query, params, fetch_results):
+        """
+        Versão de execute_query que consulta o cache antes do banco (para
+        SELECTs) e invalida as tabelas afetadas após comandos de escrita.
+        """
+        normalizada = normalizar_sql(query)
+
+        tabelas = tabelas_cacheaveis(normalizada) if fetch_results else None
+        if tabelas is not None:
+            # Dentro de uma transação que já alterou essas tabelas, o cache
+            # não reflete o que esta conexão enxerga: vai direto ao banco.
+            if not tabelas & self._tabelas_alteradas:
+                chave = QueryCache.chave(normalizada, params)
+                linhas = self.cache.get(chave)
+                if linhas is not None:
+                    return list(linhas)
+                self.cursor.execute(query, params)
+                linhas = self.cursor.fetchall()
+                self.cache.set(chave, tuple(linhas), tabelas)
+                return linhas
+
+        self.cursor.execute(query, params)
+        # Lê o resultado antes de publicar a invalidação
+        resultado = self.cursor.fetchall() if fetch_results else self.cursor.rowcount
+
+        if not eh_somente_leitura(normalizada):
+            tabelas = tabelas_escritas(normalizada)
+            self._tabelas_alteradas |= tabelas
+            if tabelas:
+                self.cache.invalidate_tables(tabelas)
+            elif contem_escrita(normalizada):
+                # Escrita em tabela não identificada: descarta tudo por segurança
+                self.cache.clear()
+            self.cache.publish_invalidation(self.conn, tabelas)
+
+        return resultado
+
 
 # =========================================================================
 # APLICAÇÃO DE EXEMPLO
@@ -116,7 +587,10 @@ def main():
 
     try:
         # Cria uma instância da classe e entra no bloco 'with'
-        with PostgresDB(**DB_PARAMS) as db:
+        # Cache de resultados compartilhado entre as conexões (opcional)
+        cache = QueryCache(ttl=30, max_entradas=128)
+
+        with PostgresDB(**DB_PARAMS, cache=cache) as db:
             print("Conexão bem-sucedida.")
             
             # 1. Cria a tabela (se já existir, não fará nada)
@@ -147,6 +621,14 @@ def main():
                 
         # Ao sair do bloco 'with', o commit é executado e a conexão é fechada
 
+        # Em uma nova conexão, a primeira consulta preenche o cache (a anterior
+        # foi direto ao banco, pois a transação tinha alterado 'produtos') e a
+        # segunda é respondida pelo cache.
+        with PostgresDB(**DB_PARAMS, cache=cache) as db:
+            db.execute_query(SQL_SELECT, (preco_minimo,), fetch_results=True)
+            db.execute_query(SQL_SELECT, (preco_minimo,), fetch_results=True)
+        print(f"\nEstatísticas do cache: {cache.stats()}")
+
     except ConnectionError as e:
         print(f"Não foi possível continuar as operações: {e}")
     except Error as e:
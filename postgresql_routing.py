@@ -0,0 +1,181 @@
+# Roteamento de sessões SQLAlchemy entre o primário e réplicas de leitura.
+#
+# Usado por fastapi_example/database.py e por postgresql_orm_example.py:
+#   replicas = ReplicaSet([create_engine(url) for url in urls_das_replicas])
+#   Session = sessionmaker(class_=RoutingSession, primary=engine, replicas=replicas)
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from sqlalchemy import event, text, Select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+# Por quantos segundos, após uma escrita, as leituras da mesma sessão
+# continuam no primário (read-your-writes), evitando o atraso de replicação.
+READ_YOUR_WRITES_SECONDS = 5.0
+
+# Intervalo mínimo entre novas tentativas em uma réplica marcada como indisponível
+REPLICA_RETRY_SECONDS = 30.0
+
+
+class ReplicaSet:
+    """
+    Conjunto de engines de réplicas de leitura, escolhidas em round-robin.
+
+    Réplicas que apresentam erro de conexão são marcadas como indisponíveis e
+    só voltam ao rodízio após um health check (SELECT 1) bem-sucedido, feito
+    no máximo a cada 'retry_seconds'.
+    """
+
+    def __init__(self, engines: list, retry_seconds: float = REPLICA_RETRY_SECONDS):
+        self.engines = list(engines)
+        self.retry_seconds = retry_seconds
+        self._indisponiveis: dict = {}  # engine -> instante da falha
+        self._rodizio = itertools.cycle(range(len(self.engines))) if self.engines else None
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        # Falhas de conexão (e não erros de SQL) retiram a réplica do rodízio
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._indisponiveis[engine] = time.monotonic()
+
+    def is_down(self, engine) -> bool:
+        with self._lock:
+            return engine in self._indisponiveis
+
+    def check_health(self, engine) -> bool:
+        """Executa um SELECT 1 na réplica e atualiza o seu estado."""
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except DBAPIError:
+            self.mark_down(engine)
+            return False
+        with self._lock:
+            self._indisponiveis.pop(engine, None)
+        return True
+
+    def choose(self):
+        """Retorna a próxima réplica saudável, ou None se nenhuma estiver disponível."""
+        if self._rodizio is None:
+            return None
+        for _ in range(len(self.engines)):
+            with self._lock:
+                engine = self.engines[next(self._rodizio)]
+                falha = self._indisponiveis.get(engine)
+            if falha is None:
+                return engine
+            if time.monotonic() - falha >= self.retry_seconds and self.check_health(engine):
+                return engine
+        return None
+
+
+class RoutingSession(Session):
+    """
+    Sessão que envia leituras para as réplicas e escritas para o primário.
+
+    Vão para o primário:
+    - INSERT/UPDATE/DELETE, flushes e SELECT ... FOR UPDATE;
+    - qualquer comando em uma transação que já escreveu (a transação "gruda"
+      no primário até terminar);
+    - leituras feitas até READ_YOUR_WRITES_SECONDS após o último commit com
+      escrita desta sessão (read-your-writes);
+    - tudo dentro de 'with session.use_primary():'.
+
+    Se uma leitura falhar por erro de conexão com a réplica (que o ReplicaSet
+    então retira do rodízio), ela é repetida no primário, de forma
+    transparente para quem chamou, desde que a sessão não tenha nada a perder
+    com o rollback: nenhuma escrita na transação e nenhum objeto pendente
+    (new/dirty/deleted, que com autoflush=False ainda não foram enviados).
+    """
+
+    def __init__(self, primary=None, replicas: ReplicaSet | None = None,
+                 read_your_writes_seconds: float = READ_YOUR_WRITES_SECONDS, **kw):
+        super().__init__(**kw)
+        self.primary = primary
+        self.replicas = replicas
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._transacao_com_escrita = False
+        self._ultima_escrita = None
+        self._forcar_primario = 0
+        self._replica_usada = None
+
+    @contextmanager
+    def use_primary(self):
+        """Força todas as operações do bloco a usarem o primário."""
+        self._forcar_primario += 1
+        try:
+            yield self
+        finally:
+            self._forcar_primario -= 1
+
+    def _in_read_your_writes_window(self) -> bool:
+        return (
+            self._ultima_escrita is not None
+            and time.monotonic() - self._ultima_escrita < self.read_your_writes_seconds
+        )
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.replicas is None:
+            return self.primary
+        if (
+            self._flushing
+            or self._forcar_primario
+            or self._transacao_com_escrita
+            or self._in_read_your_writes_window()
+        ):
+            return self.primary
+        # Apenas SELECTs sem lock de linha podem ir para as réplicas
+        if isinstance(clause, Select) and clause._for_update_arg is None:
+            replica = self.replicas.choose()
+            if replica is not None:
+                self._replica_usada = replica
+                return replica
+        return self.primary
+
+    def execute(self, statement, *args, **kw):
+        self._replica_usada = None
+        try:
+            return super().execute(statement, *args, **kw)
+        except DBAPIError:
+            replica = self._replica_usada
+            # Só repete leituras que falharam por conexão (o handle_error do
+            # ReplicaSet já marcou a réplica); erros de SQL são relançados.
+            if replica is None or not self.replicas.is_down(replica):
+                raise
+            # O rollback descartaria escritas e objetos ainda não enviados
+            if self._transacao_com_escrita or self.new or self.dirty or self.deleted:
+                raise
+            # A transação (somente leitura) ficou inválida: descarta e usa o primário
+            self.rollback()
+            with self.use_primary():
+                return super().execute(statement, *args, **kw)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _marcar_escrita_no_flush(session, flush_context):
+    session._transacao_com_escrita = True
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _marcar_escrita_em_dml(orm_execute_state):
+    # UPDATE/DELETE/INSERT em massa (session.execute(update(...))) não passam pelo flush
+    if not orm_execute_state.is_select:
+        orm_execute_state.session._transacao_com_escrita = True
+
+@event.listens_for(RoutingSession, "after_commit")
+def _registrar_commit(session):
+    if session._transacao_com_escrita:
+        session._ultima_escrita = time.monotonic()
+    session._transacao_com_escrita = False
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _registrar_rollback(session):
+    session._transacao_com_escrita = False
@@ -1,25 +1,134 @@
-# Programa principal que exibe um menu para o usuário escolher entre 
-# ver a versão do Python ou listar os pacotes instalados.
+# Programa principal que exibe um menu para o usuário escolher entre
+# ver a versão do Python, listar os pacotes instalados ou medir o tempo
+# de importação dos módulos deste projeto.
 
 import sys
+import json
+import os
 import subprocess
+from functools import lru_cache
+from importlib import metadata
+
+# Módulos do projeto analisados pelo perfilador de importação
+MODULOS_DO_PROJETO = [
+    "fastapi_example.main",
+    "pandas_example",
+    "postgresql_example",
+    "postgresql_orm_example",
+    "postgresql_copy_example",
+    "streamlit_postgresql_example",
+]
+
+# Quantos módulos mais pesados exibir por módulo analisado
+TOP_MODULOS = 10
+
+# Tempo máximo (segundos) para importar cada módulo no perfilador
+TIMEOUT_IMPORTACAO = 60
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
 
 def mostrar_versao_python():
     """Exibe a versão atual do Python."""
     print(f"\nVersão do Python: \n\n{sys.version}\n")
 
+@lru_cache(maxsize=1)
+def obter_pacotes_instalados():
+    """
+    Retorna as distribuições instaladas como tuplas (nome, versão), ordenadas.
+    Usa importlib.metadata no próprio processo (sem iniciar o pip) e guarda o
+    resultado em cache; use obter_pacotes_instalados.cache_clear() para reler.
+    """
+    pacotes = {}
+    for dist in metadata.distributions():
+        nome = dist.metadata["Name"]
+        if nome:
+            pacotes.setdefault(nome, dist.version)
+    return tuple(sorted(pacotes.items(), key=lambda item: item[0].lower()))
+
 def listar_pacotes_instalados():
     """Lista todos os pacotes Python instalados."""
-    print("\nPacotes instalados:\n")
-    subprocess.run(["pip", "list"])
+    pacotes = obter_pacotes_instalados()
+    print(f"\nPacotes instalados ({len(pacotes)}):\n")
+    largura = max((len(nome) for nome, _ in pacotes), default=0)
+    for nome, versao in pacotes:
+        print(f"{nome:<{largura}}  {versao}")
     print()  # linha em branco no final
 
+def exportar_pacotes_json():
+    """Exibe os pacotes instalados em JSON (útil para comparar ambientes)."""
+    pacotes = [{"name": nome, "version": versao} for nome, versao in obter_pacotes_instalados()]
+    print(json.dumps(pacotes, indent=2, ensure_ascii=False))
+    print()
+
+def perfilar_importacao(modulo):
+    """
+    Importa o módulo em um novo interpretador com '-X importtime' e retorna
+    o tempo próprio (self) e cumulativo, em microssegundos, de cada módulo
+    importado, além do erro da importação (se houver).
+    """
+    try:
+        resultado = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+            cwd=DIRETORIO_PROJETO,
+            capture_output=True,
+            text=True,
+            timeout=TIMEOUT_IMPORTACAO,
+        )
+    except subprocess.TimeoutExpired:
+        return {"modulo": modulo, "erro": f"tempo limite de {TIMEOUT_IMPORTACAO} s excedido", "tempos": []}
+
+    tempos = []
+    erro = None
+    for linha in resultado.stderr.splitlines():
+        # Formato: "import time:      self [us] |  cumulative | imported package"
+        if not linha.startswith("import time:"):
+            continue
+        partes = linha[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[0].strip().isdigit():
+            continue  # cabeçalho
+        tempos.append({
+            "modulo": partes[2].strip(),
+            "self_us": int(partes[0]),
+            "cumulativo_us": int(partes[1]),
+        })
+    if resultado.returncode != 0:
+        linhas_erro = [l for l in resultado.stderr.splitlines() if not l.startswith("import time:")]
+        erro = linhas_erro[-1] if linhas_erro else f"código de saída {resultado.returncode}"
+
+    total = next((t["cumulativo_us"] for t in tempos if t["modulo"] == modulo), None)
+    return {"modulo": modulo, "total_us": total, "erro": erro, "tempos": tempos}
+
+def perfilar_modulos_do_projeto(formato_json=False):
+    """Mede o tempo de importação de cada módulo do projeto."""
+    relatorios = [perfilar_importacao(modulo) for modulo in MODULOS_DO_PROJETO]
+
+    if formato_json:
+        print(json.dumps(relatorios, indent=2, ensure_ascii=False))
+        print()
+        return relatorios
+
+    for relatorio in relatorios:
+        total = relatorio["total_us"]
+        total_txt = f"{total / 1000:.1f} ms" if total is not None else "n/d"
+        print(f"\n=== {relatorio['modulo']}: {total_txt} ===")
+        if relatorio["erro"]:
+            print(f"  (importação falhou: {relatorio['erro']})")
+        mais_pesados = sorted(relatorio["tempos"], key=lambda t: t["cumulativo_us"], reverse=True)
+        print(f"  {'cumulativo':>12} {'self':>10}  módulo")
+        for tempo in mais_pesados[:TOP_MODULOS]:
+            print(f"  {tempo['cumulativo_us'] / 1000:>9.1f} ms {tempo['self_us'] / 1000:>7.1f} ms  {tempo['modulo']}")
+    print()
+    return relatorios
+
 def menu_principal():
     """Exibe o menu e gerencia as escolhas do usuário."""
     while True:
         print("=== MENU PRINCIPAL ===")
         print("1 - Exibir versão do Python")
         print("2 - Listar pacotes instalados")
+        print("3 - Exportar pacotes instalados (JSON)")
+        print("4 - Perfilar tempo de importação dos módulos do projeto")
+        print("5 - Perfilar tempo de importação (JSON)")
         print("0 - Sair")
 
         opcao = input("Escolha uma opção: ").strip()
@@ -28,6 +137,12 @@ def menu_principal():
             mostrar_versao_python()
         elif opcao == "2":
             listar_pacotes_instalados()
+        elif opcao == "3":
+            exportar_pacotes_json()
+        elif opcao == "4":
+            perfilar_modulos_do_projeto()
+        elif opcao == "5":
+            perfilar_modulos_do_projeto(formato_json=True)
         elif opcao == "0":
             print("\nSaindo... até logo!")
             break
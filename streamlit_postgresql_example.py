@@ -1,7 +1,425 @@
+import io
+import itertools
+import json
+import threading
+import time
 import streamlit as st
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from sqlalchemy import text
 from typing import Optional
 
+from postgresql_example import (
+    QueryCache, normalizar_sql, eh_somente_leitura, contem_escrita, tabelas_cacheaveis, tabelas_escritas,
+)
+
+# Configurações do modo paginado
+PAGINA_TAMANHO_PADRAO = 100             # Linhas exibidas por página
+PAGINAS_PREFETCH = 1                    # Páginas extras buscadas junto com a visível
+MAX_LINHAS_RESULTADO = 100_000          # Limite de linhas navegáveis por consulta
+MAX_BYTES_PAGINA = 20 * 1024 * 1024     # Limite de memória de uma página (DataFrame)
+
+# Configurações do cache de resultados
+CACHE_TTL_SEGUNDOS = 300
+CACHE_MAX_ENTRADAS = 256
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+@st.cache_resource
+def get_result_cache() -> QueryCache:
+    """
+    Cache de resultados compartilhado por todas as sessões do app (um por processo).
+    Cada entrada registra as tabelas que a consulta lê, para que um comando
+    DML/DDL invalide apenas os resultados dessas tabelas.
+    """
+    return QueryCache(ttl=CACHE_TTL_SEGUNDOS, max_entradas=CACHE_MAX_ENTRADAS, max_bytes=CACHE_MAX_BYTES)
+
+# Intervalo padrão de atualização do catálogo de esquema (segundos)
+CATALOGO_REFRESH_SEGUNDOS = 600
+
+# =========================================================================
+# CLASSE: SchemaCatalog
+# Metadados do banco (tabelas, colunas, índices e tamanhos) em cache.
+# =========================================================================
+
+# Uma única consulta ao pg_catalog traz tudo o que o navegador de esquema
+# precisa. As linhas vêm de pg_class.reltuples (estimativa mantida pelo
+# ANALYZE/autovacuum), sem nenhum count(*) nas tabelas.
+SQL_CATALOGO = """
+SELECT n.nspname AS esquema,
+       c.relname AS tabela,
+       CASE c.relkind WHEN 'r' THEN 'tabela' WHEN 'p' THEN 'particionada'
+                      WHEN 'v' THEN 'view' WHEN 'm' THEN 'view materializada'
+                      WHEN 'f' THEN 'externa' END AS tipo,
+       CASE WHEN c.reltuples < 0 THEN NULL ELSE c.reltuples::bigint END AS linhas_estimadas,
+       pg_total_relation_size(c.oid) AS bytes_total,
+       pg_relation_size(c.oid) AS bytes_dados,
+       (SELECT json_agg(json_build_object(
+                   'coluna', a.attname,
+                   'tipo', format_type(a.atttypid, a.atttypmod),
+                   'nulo', NOT a.attnotnull) ORDER BY a.attnum)
+          FROM pg_attribute a
+         WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped) AS colunas,
+       (SELECT json_agg(json_build_object(
+                   'indice', i.relname,
+                   'definicao', pg_get_indexdef(x.indexrelid),
+                   'bytes', pg_relation_size(x.indexrelid)) ORDER BY i.relname)
+          FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid
+         WHERE x.indrelid = c.oid) AS indices
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+  AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+  AND n.nspname NOT LIKE 'pg_toast%'
+ORDER BY n.nspname, c.relname;
+"""
+
+
+def _json(valor) -> list:
+    """Converte um campo json_agg (lista já decodificada, texto ou NULL) em lista."""
+    if valor is None:
+        return []
+    if isinstance(valor, str):
+        return json.loads(valor)
+    return list(valor)
+
+
+class SchemaCatalog:
+    """
+    Catálogo de esquema de uma conexão, recarregado no máximo a cada
+    'refresh_segundos' (ou sob demanda, após DDL ou pelo botão de atualizar).
+    """
+
+    def __init__(self, refresh_segundos: int = CATALOGO_REFRESH_SEGUNDOS):
+        self.refresh_segundos = refresh_segundos
+        self.df: Optional[pd.DataFrame] = None
+        self.carregado_em: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Força o recarregamento na próxima leitura."""
+        self.carregado_em = None
+
+    def get(self, conn) -> pd.DataFrame:
+        """Retorna o catálogo, recarregando-o se estiver vencido."""
+        with self._lock:
+            vencido = (
+                self.carregado_em is None
+                or time.monotonic() - self.carregado_em > self.refresh_segundos
+            )
+            if vencido:
+                self.df = conn.query(SQL_CATALOGO, ttl=0)
+                self.carregado_em = time.monotonic()
+            return self.df
+
+    def idade_segundos(self) -> Optional[float]:
+        if self.carregado_em is None:
+            return None
+        return time.monotonic() - self.carregado_em
+
+
+@st.cache_resource
+def get_schema_catalog(connection_name: str, refresh_segundos: int = CATALOGO_REFRESH_SEGUNDOS) -> SchemaCatalog:
+    """Um catálogo por conexão, compartilhado entre as sessões do app."""
+    return SchemaCatalog(refresh_segundos)
+
+# Configurações da execução em segundo plano
+STATEMENT_TIMEOUT_PADRAO = 60           # Segundos até o PostgreSQL abortar a consulta
+MAX_CONSULTAS_SIMULTANEAS = 4           # Consultas em andamento por sessão
+
+# =========================================================================
+# CLASSE: BackgroundQueryRunner
+# Executa consultas em threads, com timeout e cancelamento no servidor.
+# =========================================================================
+
+class QueryJob:
+    """Estado de uma consulta executada em segundo plano."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, query: str, timeout_segundos: int):
+        self.id = next(self._ids)
+        self.query = query
+        self.timeout_segundos = timeout_segundos
+        self.status = "na fila"  # na fila -> executando -> concluída | erro | cancelada
+        self.inicio = time.monotonic()
+        self.fim: Optional[float] = None
+        self.conexao_pg = None  # Conexão psycopg que executa a consulta (para o cancelamento)
+        self.resultado: Optional[pd.DataFrame] = None
+        self.linhas_afetadas: Optional[int] = None
+        self.truncado = False
+        self.erro: Optional[str] = None
+        self.cancelamento_pedido = False
+        # Protege conexao_pg: o cancelamento só a usa enquanto ela é desta consulta.
+        # O lock é mantido apenas para ler/trocar a referência, nunca durante E/S.
+        self.lock = threading.Lock()
+
+    @property
+    def em_andamento(self) -> bool:
+        return self.status in ("na fila", "executando")
+
+    def tempo_decorrido(self) -> float:
+        return (self.fim or time.monotonic()) - self.inicio
+
+
+class BackgroundQueryRunner:
+    """
+    Mantém as consultas em segundo plano de uma sessão do Streamlit.
+
+    Cada consulta roda em sua própria conexão do pool do st.connection, com
+    'SET LOCAL statement_timeout', e pode ser cancelada por uma requisição de
+    cancelamento do libpq (um socket à parte, fora do pool). O script do
+    Streamlit nunca fica bloqueado.
+    """
+
+    def __init__(self, connector: "PostgresConnector"):
+        self.connector = connector
+        self.jobs: list[QueryJob] = []
+
+    def em_andamento(self) -> list[QueryJob]:
+        return [job for job in self.jobs if job.em_andamento]
+
+    def submit(self, query: str, timeout_segundos: int = STATEMENT_TIMEOUT_PADRAO) -> QueryJob:
+        if len(self.em_andamento()) >= MAX_CONSULTAS_SIMULTANEAS:
+            raise RuntimeError(f"Limite de {MAX_CONSULTAS_SIMULTANEAS} consultas simultâneas atingido.")
+        job = QueryJob(query, timeout_segundos)
+        self.jobs.insert(0, job)
+        threading.Thread(target=self._executar, args=(job,), name=f"query-job-{job.id}", daemon=True).start()
+        return job
+
+    def _executar(self, job: QueryJob):
+        somente_leitura = eh_somente_leitura(normalizar_sql(job.query))
+        try:
+            with self.connector.conn.engine.connect() as conn:
+                try:
+                    # SET LOCAL vale só para a transação corrente desta conexão
+                    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(job.timeout_segundos * 1000)}")
+                    with job.lock:
+                        job.conexao_pg = conn.connection.driver_connection
+                    # Verificado depois de publicar a conexão: um cancel() anterior
+                    # é visto aqui; um posterior encontra a conexão publicada.
+                    if job.cancelamento_pedido:
+                        raise RuntimeError("cancelada antes de iniciar")
+                    job.status = "executando"
+                    # Leituras usam cursor no servidor (stream_results): só as
+                    # linhas buscadas pelo fetchmany chegam à memória do app.
+                    opcoes = {"stream_results": True} if somente_leitura else {}
+                    resultado = conn.execute(text(job.query), execution_options=opcoes)
+                    if resultado.returns_rows:
+                        linhas = resultado.fetchmany(MAX_LINHAS_RESULTADO + 1)
+                        job.truncado = len(linhas) > MAX_LINHAS_RESULTADO
+                        job.resultado = pd.DataFrame(linhas[:MAX_LINHAS_RESULTADO], columns=list(resultado.keys()))
+                        resultado.close()
+                    else:
+                        job.linhas_afetadas = resultado.rowcount
+                    # Um cancelamento enviado antes de o comando chegar ao servidor
+                    # é ignorado por ele: o resultado é descartado aqui.
+                    if job.cancelamento_pedido:
+                        raise RuntimeError("cancelada pelo usuário")
+                    conn.commit()
+                finally:
+                    with job.lock:
+                        job.conexao_pg = None
+                    # Um cancelamento em trânsito poderia atingir a próxima consulta
+                    # que usasse esta conexão: ela é descartada em vez de voltar ao pool.
+                    if job.cancelamento_pedido:
+                        conn.invalidate()
+            if not somente_leitura:
+                self.connector.invalidate_for(job.query)
+            job.status = "concluída"
+        except Exception as e:
+            job.status = "cancelada" if job.cancelamento_pedido else "erro"
+            job.erro = str(e)
+        finally:
+            job.fim = time.monotonic()
+
+    def cancel(self, job: QueryJob) -> bool:
+        """
+        Pede ao servidor que cancele a consulta. Não usa uma conexão do pool
+        (que pode estar esgotado pelas próprias consultas em andamento).
+        """
+        if not job.em_andamento:
+            return False
+        job.cancelamento_pedido = True
+        with job.lock:
+            conexao_pg = job.conexao_pg
+        if conexao_pg is None:
+            # Ainda na fila: a thread verá o pedido antes de executar a consulta
+            return True
+        try:
+            conexao_pg.cancel_safe()
+        except Exception:
+            # A consulta terminou nesse meio-tempo; o pedido já foi registrado
+            pass
+        return True
+
+    def remove_finished(self):
+        self.jobs = [job for job in self.jobs if job.em_andamento]
+
+
+def get_query_runner(connector: "PostgresConnector") -> BackgroundQueryRunner:
+    """Um executor por sessão do navegador, guardado em st.session_state."""
+    runner = st.session_state.get("query_runner")
+    if runner is None:
+        runner = st.session_state["query_runner"] = BackgroundQueryRunner(connector)
+    runner.connector = connector
+    return runner
+
+
+@st.fragment(run_every=1)
+def show_background_jobs(runner: BackgroundQueryRunner):
+    """
+    Painel das consultas em segundo plano. Por ser um fragmento com
+    run_every, só ele é reexecutado a cada segundo, não o app inteiro.
+    """
+    if not runner.jobs:
+        return
+    st.subheader("Consultas em Segundo Plano")
+    if st.button("Remover concluídas", key="remover_concluidas"):
+        runner.remove_finished()
+    for job in runner.jobs:
+        decorrido = job.tempo_decorrido()
+        titulo = f"#{job.id} · {job.status} · {decorrido:.1f} s · {normalizar_sql(job.query)[:60]}"
+        with st.expander(titulo, expanded=job.em_andamento or job.id == runner.jobs[0].id):
+            if job.em_andamento:
+                fracao = min(decorrido / job.timeout_segundos, 1.0) if job.timeout_segundos else 0.0
+                st.progress(fracao, text=f"{decorrido:.1f} s de {job.timeout_segundos} s (statement_timeout)")
+                if st.button("Cancelar", key=f"cancelar_{job.id}"):
+                    runner.cancel(job)
+            elif job.status == "concluída":
+                if job.resultado is not None:
+                    if job.truncado:
+                        st.warning(f"Resultado truncado em {MAX_LINHAS_RESULTADO:,} linhas.")
+                    st.dataframe(job.resultado, use_container_width=True)
+                else:
+                    st.success(f"Comando executado. Linhas afetadas: {job.linhas_afetadas}")
+            else:
+                st.error(f"Consulta {job.status}: {job.erro}")
+
+# Configurações do perfilador de consultas (EXPLAIN ANALYZE)
+LIMIAR_SEQ_SCAN_LINHAS = 10_000         # Seq Scan acima disso é destacado
+LIMIAR_ERRO_ESTIMATIVA = 10             # Estimado x real com fator maior que isso
+MAX_HISTORICO_PLANOS = 50               # Perfis guardados por sessão
+
+# =========================================================================
+# PERFILADOR: EXPLAIN (ANALYZE, BUFFERS)
+# =========================================================================
+
+def flatten_plan(plano: dict, profundidade: int = 0) -> list[dict]:
+    """
+    Achata a árvore de um plano JSON do PostgreSQL em uma linha por nó, com
+    tempo total e próprio (descontando os filhos), linhas estimadas x reais
+    e buffers lidos do cache (hit) e do disco (read).
+    """
+    loops = plano.get("Actual Loops", 1) or 1
+    filhos = plano.get("Plans", [])
+    tempo_total = plano.get("Actual Total Time", 0.0) * loops
+    tempo_filhos = sum(f.get("Actual Total Time", 0.0) * (f.get("Actual Loops", 1) or 1) for f in filhos)
+    linhas_reais = plano.get("Actual Rows", 0) * loops
+    linhas_estimadas = plano.get("Plan Rows", 0) * loops
+    fator = max(linhas_reais, 1) / max(linhas_estimadas, 1)
+    linha = {
+        "nó": "  " * profundidade + plano.get("Node Type", "?"),
+        "relação": plano.get("Relation Name") or plano.get("Index Name") or "",
+        "tempo_total_ms": round(tempo_total, 3),
+        "tempo_proprio_ms": round(max(tempo_total - tempo_filhos, 0.0), 3),
+        "linhas_estimadas": int(linhas_estimadas),
+        "linhas_reais": int(linhas_reais),
+        "fator_estimativa": round(fator if fator >= 1 else -1 / fator, 1),
+        "buffers_hit": plano.get("Shared Hit Blocks", 0),
+        "buffers_read": plano.get("Shared Read Blocks", 0),
+        "_tipo": plano.get("Node Type", ""),
+        "_relacao": plano.get("Relation Name"),
+    }
+    linhas = [linha]
+    for filho in filhos:
+        linhas.extend(flatten_plan(filho, profundidade + 1))
+    return linhas
+
+
+def flag_plan_issues(df_plano: pd.DataFrame, linhas_por_tabela: dict) -> pd.DataFrame:
+    """
+    Adiciona a coluna 'alerta' marcando Seq Scans em tabelas grandes (pelo
+    maior valor entre as linhas lidas e a estimativa do catálogo) e nós cuja
+    estimativa de linhas errou por um fator maior que LIMIAR_ERRO_ESTIMATIVA.
+    """
+    alertas = []
+    for _, no in df_plano.iterrows():
+        alerta = []
+        if no["_tipo"] == "Seq Scan":
+            tamanho = max(no["linhas_reais"], linhas_por_tabela.get(no["_relacao"]) or 0)
+            if tamanho >= LIMIAR_SEQ_SCAN_LINHAS:
+                alerta.append(f"⚠️ Seq Scan em tabela grande (~{int(tamanho):,} linhas)")
+        if abs(no["fator_estimativa"]) >= LIMIAR_ERRO_ESTIMATIVA:
+            alerta.append(f"⚠️ Estimativa errada ({no['fator_estimativa']:+}x)")
+        alertas.append(" · ".join(alerta))
+    df_plano = df_plano.drop(columns=["_tipo", "_relacao"])
+    df_plano.insert(1, "alerta", alertas)
+    return df_plano
+
+
+def show_profile(perfil: dict, linhas_por_tabela: dict):
+    """Exibe o plano perfilado e o histórico de perfis da sessão."""
+    st.subheader("Perfil da Query (EXPLAIN ANALYZE, BUFFERS)")
+    col_exec, col_plan, col_hit, col_read = st.columns(4)
+    col_exec.metric("Execução", f"{perfil['tempo_execucao_ms']:.1f} ms")
+    col_plan.metric("Planejamento", f"{perfil['tempo_planejamento_ms']:.1f} ms")
+    col_hit.metric("Buffers hit", perfil["buffers_hit"])
+    col_read.metric("Buffers read", perfil["buffers_read"])
+
+    df_plano = flag_plan_issues(pd.DataFrame(flatten_plan(perfil["plano"])), linhas_por_tabela)
+    for alerta in filter(None, df_plano["alerta"]):
+        st.warning(alerta)
+    st.dataframe(df_plano, use_container_width=True, hide_index=True)
+    st.caption("A consulta foi executada dentro de uma transação desfeita (ROLLBACK).")
+
+    # Histórico da sessão: compare tempos antes e depois de criar um índice, por exemplo
+    historico = st.session_state.get("historico_perfis", [])
+    if len(historico) > 1:
+        st.markdown("**Histórico de perfis desta sessão**")
+        st.dataframe(pd.DataFrame([
+            {k: v for k, v in item.items() if k != "plano"} for item in reversed(historico)
+        ]), use_container_width=True, hide_index=True)
+
+# =========================================================================
+# LEITURA COLUNAR (ARROW)
+# =========================================================================
+
+# Tipos Arrow para os OIDs mais comuns do PostgreSQL. Os demais tipos são lidos
+# como texto: deixar o leitor CSV inferir o tipo pelo primeiro bloco falha (ou
+# perde precisão) quando as linhas seguintes não seguem o mesmo formato.
+TIPOS_ARROW_POR_OID = {
+    16: pa.bool_(),                     # bool
+    20: pa.int64(), 21: pa.int16(), 23: pa.int32(),
+    700: pa.float32(), 701: pa.float64(),
+    25: pa.string(), 1042: pa.string(), 1043: pa.string(),  # text, bpchar, varchar
+    114: pa.string(), 3802: pa.string(), 2950: pa.string(), # json, jsonb, uuid
+    1082: pa.date32(),
+    1114: pa.timestamp("us"), 1184: pa.timestamp("us", tz="UTC"),
+}
+OID_NUMERIC = 1700
+PRECISAO_MAXIMA_DECIMAL128 = 38
+
+
+def tipo_arrow(coluna) -> pa.DataType:
+    """
+    Tipo Arrow de uma coluna do cursor.description. numeric(p, s) vira
+    decimal128(p, s) quando cabe em 128 bits; numeric sem precisão declarada
+    (ou maior que 38 dígitos) vira texto, para não perder casas decimais.
+    """
+    if coluna.type_code == OID_NUMERIC:
+        if coluna.precision is not None and coluna.precision <= PRECISAO_MAXIMA_DECIMAL128:
+            return pa.decimal128(coluna.precision, coluna.scale or 0)
+        return pa.string()
+    return TIPOS_ARROW_POR_OID.get(coluna.type_code, pa.string())
+
+
+def colunas_chave(coluna_chave: str) -> list[str]:
+    """Separa a chave de paginação keyset ('criado_em, id') em nomes de colunas."""
+    return [coluna.strip() for coluna in coluna_chave.split(",") if coluna.strip()]
+
+
 # =========================================================================
 # CLASSE: PostgresConnector
 # Responsável por toda a lógica de acesso e consulta ao PostgreSQL.
@@ -13,12 +431,16 @@ class PostgresConnector:
     usando o st.connection do Streamlit.
     """
     
-    def __init__(self, connection_name: str = "postgresql"):
+    def __init__(self, connection_name: str = "postgresql",
+                 catalog_refresh_segundos: int = CATALOGO_REFRESH_SEGUNDOS):
         """
         Inicializa o conector, tentando estabelecer a conexão com o banco de dados.
+        - catalog_refresh_segundos: Intervalo de atualização do catálogo de esquema.
         """
         self.connection_name = connection_name
         self.conn = None
+        self.cache = get_result_cache()
+        self.catalog = get_schema_catalog(connection_name, catalog_refresh_segundos)
         
         try:
             # st.connection armazena a conexão em cache de forma segura
@@ -28,60 +450,130 @@ class PostgresConnector:
                      f"Verifique suas credenciais em .streamlit/secrets.toml. Detalhes: {e}")
             st.stop() # Para o app se a conexão falhar
             
-    def get_tables(self) -> Optional[pd.DataFrame]:
+    def get_catalog(self) -> Optional[pd.DataFrame]:
+        """
+        Retorna o catálogo completo (todas as tabelas e views de todos os
+        esquemas de usuário), ou None em caso de erro.
         """
-        Método que lista todas as tabelas no esquema 'public'.
+        if self.conn is None:
+            st.error("Conexão com o banco de dados não está estabelecida.")
+            return None
+        try:
+            return self.catalog.get(self.conn)
+        except Exception as e:
+            st.error(f"Erro ao consultar o catálogo: {e}")
+            return None
+
+    def get_tables(self, schema: str = "public") -> Optional[pd.DataFrame]:
+        """
+        Método que lista as tabelas do esquema informado (padrão 'public'),
+        com linhas estimadas e tamanho, a partir do catálogo em cache.
         Retorna um DataFrame do Pandas ou None em caso de erro.
         """
         st.subheader("Tabelas Encontradas")
-        
-        # Query SQL para listar tabelas
-        query = """
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = 'public'
-        ORDER BY table_name;
-        """
-        
-        # Usamos st.cache_data para cachear o resultado das tabelas,
-        # pois elas raramente mudam, economizando tempo.
-        @st.cache_data(ttl=600)
-        def fetch_table_names():
-            try:
-                if self.conn is None:
-                    st.error("Conexão com o banco de dados não está estabelecida.")
-                    return None
-                df = self.conn.query(query, ttl=600)
-                return df
-            except Exception as e:
-                st.error(f"Erro ao listar tabelas: {e}")
-                return None
-
-        df_tabelas = fetch_table_names()
-
-        if df_tabelas is not None and not df_tabelas.empty:
-            st.dataframe(df_tabelas, use_container_width=True)
-        else:
+
+        col_filtro, col_atualizar = st.columns([4, 1])
+        filtro = col_filtro.text_input("Filtrar tabelas", value="", key="filtro_tabelas")
+        if col_atualizar.button("Atualizar catálogo", key="atualizar_catalogo"):
+            self.catalog.invalidate()
+
+        df_catalogo = self.get_catalog()
+        if df_catalogo is None or df_catalogo.empty:
             st.warning("Nenhuma tabela encontrada ou erro na consulta de metadados.")
-            
+            return None
+
+        df_esquema = df_catalogo[df_catalogo["esquema"] == schema]
+        if filtro:
+            df_esquema = df_esquema[df_esquema["tabela"].str.contains(filtro, case=False, regex=False)]
+
+        # A primeira coluna continua sendo o nome da tabela (usado pelo app principal)
+        df_tabelas = pd.DataFrame({
+            "table_name": df_esquema["tabela"],
+            "tipo": df_esquema["tipo"],
+            "linhas_estimadas": df_esquema["linhas_estimadas"],
+            "tamanho_mb": (df_esquema["bytes_total"] / (1024 * 1024)).round(2),
+        }).reset_index(drop=True)
+
+        if df_tabelas.empty:
+            st.warning("Nenhuma tabela encontrada ou erro na consulta de metadados.")
+            return df_tabelas
+
+        idade = self.catalog.idade_segundos() or 0
+        st.caption(f"{len(df_tabelas)} objetos · catálogo carregado há {idade:.0f} s · "
+                   "linhas estimadas por pg_class.reltuples")
+        st.dataframe(df_tabelas, use_container_width=True)
+
+        # Detalhes da tabela selecionada (colunas e índices), sem novas consultas
+        tabela = st.selectbox("Detalhes da tabela", df_tabelas["table_name"], key="tabela_detalhe")
+        if tabela:
+            linha = df_esquema[df_esquema["tabela"] == tabela].iloc[0]
+            col_colunas, col_indices = st.columns(2)
+            col_colunas.markdown("**Colunas**")
+            col_colunas.dataframe(pd.DataFrame(_json(linha["colunas"])), use_container_width=True)
+            col_indices.markdown("**Índices**")
+            df_indices = pd.DataFrame(_json(linha["indices"]))
+            if df_indices.empty:
+                col_indices.info("Sem índices.")
+            else:
+                col_indices.dataframe(df_indices, use_container_width=True)
+
         return df_tabelas
-            
+
+    def cached_query(self, query: str, params: Optional[dict] = None,
+                     tabelas: Optional[set] = None) -> pd.DataFrame:
+        """
+        Executa um SELECT passando pelo cache de resultados.
+        - tabelas: Tabelas lidas pela consulta (detectadas no SQL se omitidas).
+
+        Só vai para o cache a consulta cujas tabelas lidas foram todas
+        identificadas e que não chama funções voláteis ou com efeitos
+        colaterais (nextval, now, pg_cancel_backend...); as demais sempre
+        são executadas no banco.
+        """
+        if tabelas is None:
+            tabelas = tabelas_cacheaveis(normalizar_sql(query))
+        if tabelas is None:
+            return self.conn.query(query, params=params, ttl=0)
+        chave = QueryCache.chave(query, params)
+        df = self.cache.get(chave)
+        if df is None:
+            df = self.conn.query(query, params=params, ttl=0) # ttl=0: o cache é o nosso
+            self.cache.set(chave, df, tabelas, tamanho=int(df.memory_usage(deep=True).sum()))
+        return df
+
+    def invalidate_for(self, query: str):
+        """
+        Invalida apenas os resultados das tabelas alteradas por um comando
+        DML/DDL. Se as tabelas não puderem ser identificadas, limpa tudo.
+        """
+        normalizada = normalizar_sql(query)
+        tabelas = tabelas_escritas(normalizada)
+        if tabelas:
+            self.cache.invalidate_tables(tabelas)
+        elif contem_escrita(normalizada):
+            self.cache.clear()
+        # DDL (e ANALYZE, que atualiza reltuples) muda o catálogo de esquema
+        if normalizada.split(" ", 1)[0].upper() in ("CREATE", "DROP", "ALTER", "ANALYZE", "VACUUM"):
+            self.catalog.invalidate()
+
     def execute_query(self, query: str):
         """
         Método para executar qualquer query SQL fornecida pelo usuário.
         """
         st.subheader("Resultado da Query Personalizada")
         
-        # Limpa o cache para garantir que SELECTs recentes sejam atualizados
-        st.cache_data.clear()
-        
         try:
             # conn.query() executa e tenta retornar um DataFrame. 
             # Funciona para SELECT, INSERT, UPDATE, etc.
             if self.conn is None:
                 st.error("Conexão com o banco de dados não está estabelecida.")
                 return
-            df_resultado = self.conn.query(query, ttl=0) # ttl=0 executa sempre
+            if eh_somente_leitura(normalizar_sql(query)):
+                df_resultado = self.cached_query(query)
+            else:
+                df_resultado = self.conn.query(query, ttl=0) # ttl=0 executa sempre
+                # Só os resultados das tabelas alteradas deixam de valer
+                self.invalidate_for(query)
             
             if not df_resultado.empty:
                 # Query de seleção (SELECT)
@@ -98,6 +590,277 @@ class PostgresConnector:
             # Captura e exibe erros de SQL
             st.error(f"Erro ao executar a Query:\n\n{e}")
 
+    # ---------------------------------------------------------------------
+    # Modo paginado: apenas a página visível (e um prefetch) sai do banco
+    # ---------------------------------------------------------------------
+
+    def estimate_row_count(self, query: str) -> Optional[int]:
+        """
+        Estima o total de linhas de um SELECT pelo planejador (EXPLAIN),
+        sem executar a consulta.
+        """
+        try:
+            df_plano = self.conn.query(f"EXPLAIN (FORMAT JSON) {query}", ttl=60)
+            plano = df_plano.iloc[0, 0]
+            if isinstance(plano, str):
+                plano = json.loads(plano)
+            return int(plano[0]["Plan"]["Plan Rows"])
+        except Exception:
+            return None
+
+    def fetch_page(self, query: str, pagina: int, tamanho: int, coluna_chave: str = "",
+                   ultima_chave=None) -> tuple[pd.DataFrame, bool]:
+        """
+        Busca a página 'pagina' de um SELECT, mais PAGINAS_PREFETCH páginas.
+
+        Com 'coluna_chave' (uma ou mais colunas separadas por vírgula), usa
+        paginação por chave (keyset: WHERE (chave) > (última chave vista)), que
+        não degrada em páginas distantes; sem ela, usa LIMIT/OFFSET. Retorna o
+        DataFrame buscado e se há mais linhas depois dele.
+
+        A chave precisa ser única: linhas empatadas na fronteira de uma página
+        seriam puladas pelo '>'. Por isso, um empate no trecho buscado gera um
+        ValueError pedindo uma coluna de desempate (por exemplo, 'criado_em, id').
+        """
+        limite = tamanho * (1 + PAGINAS_PREFETCH)
+        params = {"limite": limite + 1}  # +1 para saber se existe próxima página
+        colunas = colunas_chave(coluna_chave)
+        if colunas:
+            chaves = ", ".join("_q." + '"' + coluna.replace('"', '""') + '"' for coluna in colunas)
+            filtro = ""
+            if ultima_chave is not None:
+                marcadores = ", ".join(f":ultima_chave_{i}" for i in range(len(colunas)))
+                filtro = f"WHERE ({chaves}) > ({marcadores})"
+                params.update({f"ultima_chave_{i}": valor for i, valor in enumerate(ultima_chave)})
+            sql = f"SELECT * FROM ({query}) AS _q {filtro} ORDER BY {chaves} LIMIT :limite"
+        else:
+            sql = f"SELECT * FROM ({query}) AS _q LIMIT :limite OFFSET :offset"
+            params["offset"] = pagina * tamanho
+        # As tabelas são as da consulta original (None: não usa o cache)
+        tabelas = tabelas_cacheaveis(query)
+        if tabelas is None:
+            df = self.conn.query(sql, params=params, ttl=0)
+        else:
+            df = self.cached_query(sql, params=params, tabelas=tabelas)
+        # Ordenadas pela chave, linhas empatadas ficam vizinhas: verificar o trecho
+        # buscado (com a linha extra) cobre todas as fronteiras de página dele.
+        if colunas and df.duplicated(subset=colunas).any():
+            raise ValueError(
+                f"A chave de paginação ({', '.join(colunas)}) tem valores repetidos e "
+                "linhas seriam puladas entre as páginas. Acrescente uma coluna de "
+                "desempate única, por exemplo: 'criado_em, id'."
+            )
+        return df.head(limite), len(df) > limite
+
+    def execute_paged(self, query: str, tamanho: int = PAGINA_TAMANHO_PADRAO, coluna_chave: str = ""):
+        """
+        Exibe o resultado de um SELECT página a página, com total estimado e
+        limites de linhas e de memória. O estado da navegação fica em
+        st.session_state para sobreviver aos reruns do Streamlit.
+        """
+        st.subheader("Resultado da Query Personalizada (paginado)")
+        query = normalizar_sql(query)
+        estado = st.session_state.setdefault("paginacao", {})
+        if estado.get("query") != (query, tamanho, coluna_chave):
+            estado.clear()
+            estado.update(query=(query, tamanho, coluna_chave), pagina=0,
+                          buffer=None, buffer_pagina=0, tem_mais=False, chaves={})
+        pagina = estado["pagina"]
+
+        total_estimado = self.estimate_row_count(query)
+        if total_estimado is not None:
+            st.caption(f"Total estimado pelo planejador: ~{total_estimado:,} linhas")
+
+        try:
+            # Usa o buffer (prefetch) se ele já contém a página pedida
+            buffer = estado["buffer"]
+            inicio = (pagina - estado["buffer_pagina"]) * tamanho
+            if buffer is None or inicio < 0 or (inicio >= len(buffer) and estado["tem_mais"]):
+                ultima_chave = estado["chaves"].get(pagina - 1) if coluna_chave else None
+                buffer, tem_mais = self.fetch_page(query, pagina, tamanho, coluna_chave, ultima_chave)
+                estado.update(buffer=buffer, buffer_pagina=pagina, tem_mais=tem_mais)
+                inicio = 0
+        except Exception as e:
+            st.error(f"Erro ao executar a Query:\n\n{e}")
+            return
+
+        df_pagina = buffer.iloc[inicio:inicio + tamanho]
+        proxima_existe = inicio + tamanho < len(buffer) or estado["tem_mais"]
+        if coluna_chave and not df_pagina.empty:
+            estado["chaves"][pagina] = tuple(df_pagina[colunas_chave(coluna_chave)].iloc[-1])
+
+        # Limite de memória: corta a página se ela exceder MAX_BYTES_PAGINA
+        tamanho_bytes = int(df_pagina.memory_usage(deep=True).sum())
+        if tamanho_bytes > MAX_BYTES_PAGINA and len(df_pagina) > 1:
+            linhas = max(1, len(df_pagina) * MAX_BYTES_PAGINA // tamanho_bytes)
+            df_pagina = df_pagina.head(linhas)
+            st.warning(f"Página truncada em {linhas} linhas: o resultado excedeu "
+                       f"{MAX_BYTES_PAGINA // (1024 * 1024)} MB em memória.")
+
+        # Limite de linhas: não permite navegar além de MAX_LINHAS_RESULTADO
+        primeira = pagina * tamanho
+        if primeira + tamanho >= MAX_LINHAS_RESULTADO and proxima_existe:
+            proxima_existe = False
+            st.warning(f"Resultado truncado: apenas as primeiras {MAX_LINHAS_RESULTADO:,} "
+                       "linhas podem ser navegadas. Refine a consulta (WHERE/LIMIT).")
+
+        if df_pagina.empty:
+            st.info("Query SELECT executada, mas retornou um resultado vazio (0 linhas).")
+            return
+
+        st.dataframe(df_pagina, use_container_width=True)
+        st.caption(f"Linhas {primeira + 1:,} a {primeira + len(df_pagina):,}")
+
+        col_anterior, col_proxima = st.columns(2)
+        if col_anterior.button("◀ Anterior", disabled=pagina == 0, key="pagina_anterior"):
+            estado["pagina"] = pagina - 1
+            st.rerun()
+        if col_proxima.button("Próxima ▶", disabled=not proxima_existe, key="pagina_proxima"):
+            estado["pagina"] = pagina + 1
+            st.rerun()
+
+    def profile_query(self, query: str, timeout_segundos: int = STATEMENT_TIMEOUT_PADRAO) -> dict:
+        """
+        Executa a query sob EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) dentro de
+        uma transação que é sempre desfeita, e registra o perfil no histórico
+        da sessão. Retorna o perfil (plano JSON e métricas principais).
+        """
+        query = normalizar_sql(query)
+        with self.conn.engine.connect() as conn:
+            try:
+                conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_segundos * 1000)}")
+                resultado = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}")).scalar()
+            finally:
+                # EXPLAIN ANALYZE executa de fato a query: nada pode ser confirmado
+                conn.rollback()
+        if isinstance(resultado, str):
+            resultado = json.loads(resultado)
+        raiz = resultado[0]
+        plano = raiz["Plan"]
+        perfil = {
+            "hora": time.strftime("%H:%M:%S"),
+            "query": query[:120],
+            "tempo_execucao_ms": raiz.get("Execution Time", 0.0),
+            "tempo_planejamento_ms": raiz.get("Planning Time", 0.0),
+            "buffers_hit": plano.get("Shared Hit Blocks", 0),
+            "buffers_read": plano.get("Shared Read Blocks", 0),
+            "plano": plano,
+        }
+        historico = st.session_state.setdefault("historico_perfis", [])
+        historico.append(perfil)
+        del historico[:-MAX_HISTORICO_PLANOS]
+        return perfil
+
+    def table_row_estimates(self) -> dict:
+        """Linhas estimadas (pg_class.reltuples) por tabela, a partir do catálogo."""
+        df_catalogo = self.get_catalog()
+        if df_catalogo is None:
+            return {}
+        return dict(zip(df_catalogo["tabela"], df_catalogo["linhas_estimadas"].fillna(0)))
+
+    def fetch_arrow(self, query: str, limite: int = MAX_LINHAS_RESULTADO) -> tuple[pa.Table, dict]:
+        """
+        Lê o resultado de um SELECT direto para uma tabela Arrow colunar.
+
+        O PostgreSQL serializa o resultado com COPY ... TO STDOUT (CSV) e o
+        leitor CSV do Arrow (em C++) o converte em colunas tipadas, sem criar
+        tuplas Python nem colunas 'object' do pandas. Retorna a tabela e os
+        tempos (em segundos) de busca e de conversão.
+        """
+        query = normalizar_sql(query)
+        limitada = f"SELECT * FROM ({query}) AS _q LIMIT {int(limite) + 1}"
+        tempos = {}
+        with self.conn.engine.connect() as conn:
+            pg = conn.connection.driver_connection
+            try:
+                with pg.cursor() as cursor:
+                    # Formatos previsíveis para o parser do Arrow
+                    cursor.execute("SET LOCAL DateStyle = 'ISO, YMD'")
+                    cursor.execute("SET LOCAL TimeZone = 'UTC'")
+                    # Consulta vazia só para descobrir nomes e tipos das colunas
+                    cursor.execute(f"SELECT * FROM ({limitada}) AS _t LIMIT 0")
+                    tipos = {col.name: tipo_arrow(col) for col in cursor.description}
+                    # Busca: os bytes do COPY são acumulados sem decodificação
+                    inicio = time.perf_counter()
+                    buffer = io.BytesIO()
+                    with cursor.copy(f"COPY ({limitada}) TO STDOUT (FORMAT CSV, HEADER)") as copy:
+                        for bloco in copy:
+                            buffer.write(bloco)
+                    tempos["busca"] = time.perf_counter() - inicio
+            finally:
+                conn.rollback()
+
+        # Conversão: parser CSV multi-thread do Arrow direto para colunas tipadas
+        inicio = time.perf_counter()
+        try:
+            tabela = self._ler_csv_arrow(buffer, tipos)
+        except pa.ArrowInvalid:
+            # numeric(p, s) também aceita 'NaN', que o decimal128 não representa
+            tipos = {
+                nome: pa.string() if pa.types.is_decimal(tipo) else tipo
+                for nome, tipo in tipos.items()
+            }
+            tabela = self._ler_csv_arrow(buffer, tipos)
+        tempos["conversao"] = time.perf_counter() - inicio
+        truncado = tabela.num_rows > limite
+        return tabela.slice(0, limite), {**tempos, "truncado": truncado}
+
+    @staticmethod
+    def _ler_csv_arrow(buffer: io.BytesIO, tipos: dict) -> pa.Table:
+        """Converte o CSV do COPY em uma tabela Arrow com os tipos informados."""
+        buffer.seek(0)
+        return pa_csv.read_csv(
+            buffer,
+            convert_options=pa_csv.ConvertOptions(
+                column_types=tipos,
+                true_values=["t"], false_values=["f"],
+                null_values=[""], strings_can_be_null=True,
+                quoted_strings_can_be_null=False,  # "" é string vazia, não NULL
+            ),
+        )
+
+    def execute_arrow(self, query: str):
+        """
+        Executa um SELECT no modo Arrow e o entrega ao st.dataframe sem passar
+        por um DataFrame pandas, exibindo o tempo gasto em cada etapa.
+        """
+        st.subheader("Resultado da Query Personalizada (Arrow)")
+        try:
+            tabela, tempos = self.fetch_arrow(query)
+        except Exception as e:
+            st.error(f"Erro ao executar a Query:\n\n{e}")
+            return
+        if tempos["truncado"]:
+            st.warning(f"Resultado truncado em {MAX_LINHAS_RESULTADO:,} linhas.")
+        if tabela.num_rows == 0:
+            st.info("Query SELECT executada, mas retornou um resultado vazio (0 linhas).")
+            return
+
+        inicio = time.perf_counter()
+        st.dataframe(tabela, use_container_width=True)
+        tempo_render = time.perf_counter() - inicio
+
+        col_busca, col_conversao, col_render, col_memoria = st.columns(4)
+        col_busca.metric("Busca (COPY)", f"{tempos['busca'] * 1000:.0f} ms")
+        col_conversao.metric("Conversão (Arrow)", f"{tempos['conversao'] * 1000:.0f} ms")
+        col_render.metric("Renderização", f"{tempo_render * 1000:.0f} ms")
+        col_memoria.metric("Memória (Arrow)", f"{tabela.nbytes / (1024 * 1024):.1f} MB")
+        st.caption(f"{tabela.num_rows:,} linhas × {tabela.num_columns} colunas")
+
+    def show_cache_stats(self):
+        """Exibe as estatísticas do cache de resultados na barra lateral."""
+        stats = self.cache.stats()
+        with st.sidebar:
+            st.subheader("Cache de Resultados")
+            col_hits, col_misses = st.columns(2)
+            col_hits.metric("Hits", stats["hits"])
+            col_misses.metric("Misses", stats["misses"])
+            st.metric("Taxa de acerto", f"{stats['taxa_acerto']:.0%}")
+            st.caption(f"{stats['entradas']} entradas · {stats['bytes'] / (1024 * 1024):.1f} MB · "
+                       f"{stats['invalidacoes']} invalidações · {stats['remocoes_lru']} remoções LRU")
+            if st.button("Limpar cache", key="limpar_cache"):
+                self.cache.clear()
+
 # =========================================================================
 # APLICAÇÃO STREAMLIT PRINCIPAL
 # =========================================================================
@@ -131,13 +894,60 @@ def main():
         key="sql_query_input"
     )
 
+    # Opções do modo paginado
+    modo_paginado = st.checkbox("Modo paginado para SELECT (recomendado para tabelas grandes)", value=True)
+    col_tamanho, col_chave = st.columns(2)
+    tamanho_pagina = col_tamanho.number_input("Linhas por página", min_value=10, max_value=1000,
+                                              value=PAGINA_TAMANHO_PADRAO, step=10)
+    coluna_chave = col_chave.text_input("Colunas de ordenação (keyset, opcional, chave única: ex. 'criado_em, id')",
+                                        value="")
+
+    # Opções da execução em segundo plano
+    col_fundo, col_timeout = st.columns(2)
+    em_segundo_plano = col_fundo.checkbox("Executar em segundo plano (com cancelamento)", value=False)
+    timeout_segundos = col_timeout.number_input("statement_timeout (segundos)", min_value=1,
+                                                max_value=3600, value=STATEMENT_TIMEOUT_PADRAO)
+    runner = get_query_runner(db_connector)
+    modo_arrow = st.checkbox("Modo Arrow para SELECT (resultados grandes/largos, sem pandas)", value=False)
+
     # Botão de execução
     with st.form("query_form"):
-        submitted = st.form_submit_button("Executar Query")
+        col_executar, col_perfilar = st.columns(2)
+        submitted = col_executar.form_submit_button("Executar Query")
+        perfilar = col_perfilar.form_submit_button("Perfilar (EXPLAIN ANALYZE)")
+
+    if perfilar and query_input:
+        try:
+            perfil = db_connector.profile_query(query_input, int(timeout_segundos))
+            show_profile(perfil, db_connector.table_row_estimates())
+        except Exception as e:
+            st.error(f"Erro ao perfilar a Query:\n\n{e}")
 
     if submitted and query_input:
-        # Chama o método do objeto para executar a query
-        db_connector.execute_query(query_input)
+        if em_segundo_plano:
+            try:
+                runner.submit(query_input, int(timeout_segundos))
+            except RuntimeError as e:
+                st.warning(str(e))
+        elif modo_arrow and eh_somente_leitura(normalizar_sql(query_input)):
+            st.session_state.pop("consulta_paginada", None)
+            db_connector.execute_arrow(query_input)
+        elif modo_paginado and eh_somente_leitura(normalizar_sql(query_input)):
+            # A consulta fica ativa para que a navegação entre páginas (reruns) funcione
+            st.session_state["consulta_paginada"] = query_input
+        else:
+            st.session_state.pop("consulta_paginada", None)
+            # Chama o método do objeto para executar a query
+            db_connector.execute_query(query_input)
+
+    if modo_paginado and st.session_state.get("consulta_paginada"):
+        db_connector.execute_paged(st.session_state["consulta_paginada"],
+                                   tamanho=int(tamanho_pagina), coluna_chave=coluna_chave.strip())
+
+    show_background_jobs(runner)
+
+    # Estatísticas exibidas por último, para refletir as consultas desta execução
+    db_connector.show_cache_stats()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
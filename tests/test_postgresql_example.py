@@ -0,0 +1,89 @@
+# Testes da classificação de SQL usada pelo cache de postgresql_example.py.
+# Não precisam de banco: o PostgresDB recebe um cursor falso.
+
+import pytest
+
+from postgresql_example import (
+    PostgresDB, QueryCache, contem_escrita, eh_somente_leitura,
+    normalizar_sql, tabelas_cacheaveis, tabelas_escritas,
+)
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM items WHERE title = 'update'",
+    "SELECT * FROM items WHERE title = 'delete'",
+    "SELECT * FROM items WHERE title = 'it''s a delete'",
+    "SELECT * FROM items WHERE title = E'it\\'s an update'",
+    "SELECT * FROM items WHERE title = $$drop$$",
+    "SELECT * FROM items WHERE title = $t$truncate 'x'$t$",
+    "SELECT * FROM items -- delete from items\nWHERE id = 1",
+    "SELECT * FROM items /* update items set x = 1 */ WHERE id = 1",
+])
+def test_palavras_chave_em_literais_e_comentarios_nao_sao_escrita(query):
+    normalizada = normalizar_sql(query)
+    assert eh_somente_leitura(normalizada)
+    assert not contem_escrita(normalizada)
+    assert tabelas_cacheaveis(normalizada) == {"items"}
+
+
+@pytest.mark.parametrize("query, tabelas", [
+    ("UPDATE items SET title = 'select' WHERE id = 1", {"items"}),
+    ("DELETE FROM items WHERE title = 'select'", {"items"}),
+    ("WITH x AS (DELETE FROM items RETURNING id) SELECT * FROM x", {"items"}),
+])
+def test_escritas_continuam_detectadas(query, tabelas):
+    normalizada = normalizar_sql(query)
+    assert not eh_somente_leitura(normalizada)
+    assert contem_escrita(normalizada)
+    assert tabelas_escritas(normalizada) == tabelas
+
+
+def test_from_dentro_de_literal_nao_vira_tabela():
+    assert tabelas_cacheaveis("SELECT 'x' FROM a WHERE y = 'FROM b'") == {"a"}
+
+
+def test_funcao_volatil_em_literal_nao_impede_cache():
+    assert tabelas_cacheaveis("SELECT * FROM a WHERE y = 'now()'") == {"a"}
+    assert tabelas_cacheaveis("SELECT now() FROM a") is None
+
+
+class _CursorFalso:
+    def __init__(self, executadas):
+        self.executadas = executadas
+        self.rowcount = 1
+
+    def execute(self, query, params=None):
+        self.executadas.append(query)
+
+    def fetchall(self):
+        return [(1, "update")]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _ConexaoFalsa:
+    def __init__(self, executadas):
+        self.executadas = executadas
+
+    def cursor(self):
+        return _CursorFalso(self.executadas)
+
+
+def test_literal_update_usa_o_cache_sem_invalidar():
+    executadas = []
+    cache = QueryCache(canal_notify="invalidacao")
+    db = PostgresDB("db", "user", "senha", cache=cache)
+    db.conn = _ConexaoFalsa(executadas)
+    db.cursor = db.conn.cursor()
+
+    query = "SELECT * FROM items WHERE title = 'update'"
+    assert db.execute_query(query, fetch_results=True) == [(1, "update")]
+    assert db.execute_query(query, fetch_results=True) == [(1, "update")]
+
+    assert cache.hits == 1
+    assert cache.invalidacoes == 0
+    assert executadas == [query]
@@ -0,0 +1,91 @@
+# Testes do roteamento primário/réplicas (postgresql_routing.py).
+# Usam SQLite: o primário e a réplica são arquivos temporários, e a réplica
+# "fora do ar" é um caminho que não pode ser aberto.
+
+import pytest
+from sqlalchemy import create_engine, select, text, Integer, String
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from postgresql_routing import ReplicaSet, RoutingSession
+
+
+class Base(DeclarativeBase):
+    pass
+
+class Registro(Base):
+    __tablename__ = "registro"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    origem: Mapped[str] = mapped_column(String(20))
+
+
+def _engine(caminho, origem):
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Registro.__table__.insert(), {"id": 1, "origem": origem})
+    return engine
+
+
+@pytest.fixture
+def primario(tmp_path):
+    return _engine(tmp_path / "primario.db", "primario")
+
+@pytest.fixture
+def replica(tmp_path):
+    return _engine(tmp_path / "replica.db", "replica")
+
+@pytest.fixture
+def replica_fora(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path}/nao/existe/replica.db")
+
+
+def _sessao(primario, replica, **kw):
+    replicas = ReplicaSet([replica], retry_seconds=30)
+    return sessionmaker(class_=RoutingSession, autoflush=False, primary=primario, replicas=replicas, **kw)()
+
+
+def _origem(sessao):
+    return sessao.execute(select(Registro.origem)).scalar_one()
+
+
+def test_leitura_vai_para_a_replica(primario, replica):
+    with _sessao(primario, replica) as sessao:
+        assert _origem(sessao) == "replica"
+        with sessao.use_primary():
+            assert _origem(sessao) == "primario"
+
+
+def test_leitura_apos_escrita_usa_o_primario(primario, replica):
+    with _sessao(primario, replica) as sessao:
+        sessao.add(Registro(id=2, origem="primario"))
+        sessao.commit()
+        # Janela de read-your-writes: a linha nova só existe no primário
+        assert sessao.execute(select(Registro.origem).where(Registro.id == 2)).scalar_one() == "primario"
+
+
+def test_replica_fora_do_ar_cai_para_o_primario(primario, replica_fora):
+    with _sessao(primario, replica_fora) as sessao:
+        assert _origem(sessao) == "primario"
+        assert sessao.replicas.is_down(replica_fora)
+        # A réplica fica fora do rodízio: a próxima leitura vai direto ao primário
+        assert _origem(sessao) == "primario"
+
+
+def test_sem_fallback_com_objetos_pendentes(primario, replica_fora):
+    with _sessao(primario, replica_fora) as sessao:
+        sessao.add(Registro(id=2, origem="pendente"))  # autoflush=False: ainda não enviado
+        with pytest.raises(OperationalError):
+            sessao.execute(select(Registro.origem).where(Registro.id == 1))
+        # O objeto não foi descartado por um rollback silencioso
+        assert len(sessao.new) == 1
+        sessao.commit()
+    with primario.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM registro")).scalar() == 2
+
+
+def test_erro_de_sql_na_replica_nao_e_repetido(primario, replica):
+    with _sessao(primario, replica) as sessao:
+        with pytest.raises(OperationalError):
+            sessao.execute(select(text("coluna_inexistente")).select_from(Registro))
+        assert not sessao.replicas.is_down(replica)